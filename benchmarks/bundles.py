@@ -0,0 +1,134 @@
+"""Benchmark the bundle solver on a synthetic catalog
+
+Run from the repository root with ``python -m benchmarks.bundles``
+"""
+
+import argparse
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from src import bundles
+
+# Store the meeting patterns of the synthetic sections
+DAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Monday/Wednesday",
+    "Tuesday/Thursday",
+]
+TIMES = [
+    "8:30AM-11:30AM",
+    "9:00AM-12:00PM",
+    "1:30PM-4:30PM",
+    "3:00PM-6:00PM",
+    "6:00PM-9:00PM",
+]
+
+
+def synthetic(sections, areas=12, seed=0):
+    """Create a synthetic planner for a single quarter and program
+
+    Args:
+        sections (int): The number of sections
+        areas (int, optional): The number of requirement areas. Defaults
+            to 12.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        DataFrame: The synthetic planner
+    """
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Course": rng.integers(30000, 30000 + sections // 2, sections),
+            "Quarter": "Winter",
+            "Program": "Evening",
+            "Day": rng.choice(DAYS, sections),
+            "Time": rng.choice(TIMES, sections),
+            "Recommend Course": rng.uniform(3, 5, sections).round(2),
+            "Price for P1": rng.integers(0, 3000, sections).astype(float),
+        }
+    )
+    for area in range(areas):
+        df[f"Area{area}"] = np.where(rng.random(sections) < 0.2, 1.0, np.nan)
+    return df
+
+
+def brute_force(df, areas, max_courses):
+    """Find the value of the best bundle by trying every combination
+
+    Args:
+        df (DataFrame): The synthetic planner
+        areas (list): The target requirement areas
+        max_courses (int): The largest number of sections in a bundle
+
+    Returns:
+        float: The value of the best bundle
+    """
+
+    sections = bundles.candidates(df, "Winter", "Evening", areas)
+    value = bundles.values(sections, "Recommend Course", "Price for P1", 1e-3)
+    taken = bundles.slots(sections["Day"], sections["Time"])
+    courses = sections["Course"].to_numpy()
+    best = -np.inf
+    for k in range(1, max_courses + 1):
+        for combo in itertools.combinations(range(len(sections)), k):
+            combo = list(combo)
+            if taken[combo].sum(axis=0).max() > 1:
+                continue
+            if len(set(courses[combo])) < k:
+                continue
+            best = max(best, value[combo].sum())
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sections", type=int, nargs="+", default=[500, 2000, 5000]
+    )
+    parser.add_argument("--max-courses", type=int, default=4)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    # Check the solver against brute force on a small catalog
+    areas = ["Area0", "Area1", "Area2"]
+    small = synthetic(40)
+    expected = brute_force(small, areas, 3)
+    found = bundles.solve(small, "Winter", "Evening", areas, max_courses=3)
+    assert np.isclose(found["Bundle Value"].iloc[0], expected)
+
+    print(f"{'sections':>9} {'candidates':>11} {'conflicts (s)':>14}", end="")
+    print(f" {'solve (s)':>10} {'best value':>11}")
+    for n in args.sections:
+        df = synthetic(n)
+        sections = bundles.candidates(df, "Winter", "Evening", areas)
+
+        start = time.perf_counter()
+        bundles.conflicts(sections)
+        t_conflicts = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = bundles.solve(
+            df,
+            "Winter",
+            "Evening",
+            areas,
+            max_courses=args.max_courses,
+            top=args.top,
+        )
+        t_solve = time.perf_counter() - start
+
+        best = found["Bundle Value"].iloc[0]
+        print(f"{n:>9} {len(sections):>11} {t_conflicts:>14.3f}", end="")
+        print(f" {t_solve:>10.3f} {best:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark the chunked BLUE reader against reading the whole export
+
+Run from the repository root with ``python -m benchmarks.evals_reader``
+"""
+
+import argparse
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from src import course_evals, helper
+from . import harness, synthetic
+
+# Store the departments of an export across all schools
+DEPARTMENTS = ["BUSN", "ECON", "PPHA", "SOCI", "MATH", "LAWS", "CMSC"]
+
+# Store the names given to the columns of the export
+COLUMNS = {
+    "Courses - LONG_CLASS_TITLE": "Title",
+    "Invites": "Enrollment",
+    "Resp.": "Responses",
+    r"%Resp": "Percent Responses",
+    "Q1 Average Number of Hours Per Week Spent in Preparation": (
+        "Hours Per Week"
+    ),
+    "Q2 Info Clearly Conveyed": "Convey Clearly",
+    "Q3 Info Conveyed In an Interesting Way": "Convey Interesting",
+    "Q4 Acquired Useful Tools": "Useful Tools",
+    "Q5 Amount Learned from Course": "Out Of Course",
+    "Q6 Recommend Course to Others": "Recommend Course",
+}
+
+
+def generate(fname, rows, seed=0):
+    """Write a synthetic BLUE export where a few rows are BUSN courses
+
+    Args:
+        fname (str): The name of the file
+        rows (int): The number of evaluations
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    rng = np.random.default_rng(seed)
+    shared = synthetic.catalog(rng, 1)
+    synthetic.new_evaluations(rng, shared, rows, fname, DEPARTMENTS)
+
+
+def legacy_read(fname):
+    """Read the whole export, split every title, then keep BUSN courses"""
+
+    df = pd.read_csv(fname)
+    df[["Department", "Course", "Section"]] = df["Course Title"].str.split(
+        " ", expand=True
+    )
+    df = df[df["Department"] == "BUSN"]
+    df["Course"] = df["Course"].astype(int)
+    df["Section"] = df["Section"].astype(int)
+    df["Program"] = helper.programs(df["Section"])
+    df[["Quarter", "Year"]] = df["Quarter"].str.split(" ", expand=True)
+    df["Year"] = df["Year"].astype(int)
+    df["Quarter"] = helper.quarters(df["Quarter"])
+    df["Last Name"] = helper.last_names(df["Last Name"])
+    df["Instructor ID"] = helper.instructor_ids(df["Last Name"])
+    df = df.drop(columns=["Course Title", "Department"])
+
+    df = df.rename(COLUMNS, axis=1)
+    df["Percent Responses"] = df["Percent Responses"].round(0)
+    scores = list(COLUMNS.values())[4:]
+    df[scores] = df[scores].round(1)
+    df = helper.encode(df)
+    df = df[helper.column_ordering(df.columns)]
+    return df.sort_values(helper.column_sorting(df.columns))
+
+
+def chunked_read(fname):
+    """Read the export in chunks, keeping BUSN courses first"""
+
+    return course_evals.read_new(fname)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100000, 1000000]
+    )
+    args = parser.parse_args()
+
+    # Measure each reader in a fresh process so peak memory is comparable
+    print(f"{'rows':>8} {'reader':>10} {'seconds':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            fname = os.path.join(directory, f"blue_{rows}.csv")
+            harness.spawned(generate, fname, rows)
+            results = {}
+            for reader in [legacy_read, chunked_read]:
+                seconds, peak, df = harness.isolated(reader, fname)
+                results[reader.__name__] = df
+                name = reader.__name__.split("_")[0]
+                print(f"{rows:>8} {name:>10} {seconds:>8.2f} {peak:>8.0f}")
+            harness.assert_same(
+                results["legacy_read"], results["chunked_read"]
+            )
+
+
+if __name__ == "__main__":
+    main()
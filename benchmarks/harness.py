@@ -0,0 +1,125 @@
+"""Time calls and measure their memory for the other benchmarks
+
+The benchmarks compare a legacy implementation with the current one, so
+this module holds the timing, the memory measurements and the check that
+both give the same frame.
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Store the unit of ru_maxrss in MB, which is bytes on macOS and KB on Linux
+MAXRSS_MB = 1024**2 if sys.platform == "darwin" else 1024
+
+
+def best(func, repeat, setup=None):
+    """Time the fastest of repeated calls
+
+    Args:
+        func (function): The function to time
+        repeat (int): The number of calls
+        setup (function, optional): Returns the arguments of each call,
+            such as fresh copies of its inputs, outside of the time.
+            Defaults to None, which calls func without arguments.
+
+    Returns:
+        float: The fastest time in seconds
+    """
+
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def resident(func, *args):
+    """Time a call and report the peak resident memory of the process
+
+    Args:
+        func (function): The function to call
+        *args: The arguments to func
+
+    Returns:
+        tuple: The seconds taken, the peak memory in MB and the result
+    """
+
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / MAXRSS_MB
+    return seconds, peak, result
+
+
+def traced(func, *args):
+    """Time a call and trace the peak memory it allocates
+
+    Args:
+        func (function): The function to call
+        *args: The arguments to func
+
+    Returns:
+        tuple: The seconds taken, the peak memory in MB and the result
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def spawned(func, *args):
+    """Call a function in a fresh process
+
+    The process is spawned rather than forked, since a child inherits the
+    peak memory of the process that started it.
+
+    Args:
+        func (function): The function to call, importable by the child
+        *args: The arguments to func
+
+    Returns:
+        object: The result of func(*args)
+    """
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        return pool.submit(func, *args).result()
+
+
+def isolated(func, *args):
+    """Time a call in a fresh process and report its peak resident memory
+
+    Args:
+        func (function): The function to call, importable by the child
+        *args: The arguments to func
+
+    Returns:
+        tuple: The seconds taken, the peak memory in MB and the result
+    """
+
+    return spawned(resident, func, *args)
+
+
+def assert_same(legacy, current, **kwargs):
+    """Check that the legacy and current versions give the same frame
+
+    Args:
+        legacy (DataFrame): The result of the legacy version
+        current (DataFrame): The result of the current version
+        **kwargs: The options of pd.testing.assert_frame_equal
+    """
+
+    pd.testing.assert_frame_equal(
+        legacy.reset_index(drop=True), current.reset_index(drop=True), **kwargs
+    )
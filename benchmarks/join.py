@@ -0,0 +1,114 @@
+"""Benchmark the single-pass join against successive merges
+
+Run from the repository root with ``python -m benchmarks.join``
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from src import helper, join
+from . import harness, synthetic
+
+
+def overview(rows, seed=0):
+    """Create a synthetic course overview and the sources joined onto it
+
+    The sections are drawn from the catalog of the synthetic data files.
+
+    Args:
+        rows (int): The number of sections
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        tuple: The overview and the list of sources as in join.main
+    """
+
+    rng = np.random.default_rng(seed)
+    shared = synthetic.catalog(rng, 1)
+    courses, sections, instructors = synthetic.offerings(rng, shared, rows)
+    df = pd.DataFrame({"Course": courses, "Section": sections})
+    df["Program"] = helper.programs(df["Section"])
+    df = df.join(helper.names(pd.Series(instructors)))
+    df["Title"] = [shared["titles"][c] for c in courses]
+    df = helper.encode(df)
+
+    # Store one row per key, covering most of the overview
+    keys = df[join.GROUP_VARS].drop_duplicates()
+    courses = pd.DataFrame({"Course": df["Course"].unique()})
+    for i in range(20):
+        courses[f"Area{i}"] = rng.integers(0, 2, len(courses)).astype(float)
+    prices = keys.sample(frac=0.9, random_state=seed).reset_index(drop=True)
+    evals = keys.sample(frac=0.8, random_state=seed + 1).reset_index(drop=True)
+    for p in ["P1", "P2", "P3"]:
+        prices[f"Price for {p}"] = rng.uniform(0, 5000, len(prices))
+    for c in ["Hours Per Week", "Convey Clearly", "Recommend Course"]:
+        evals[c] = rng.uniform(0, 5, len(evals))
+    forecasts = pd.DataFrame({"Forecast Price for P1": rng.uniform(size=rows)})
+    sources = [
+        ("requirements", courses, ["Course"]),
+        ("prices", prices, join.GROUP_VARS),
+        ("forecasts", forecasts, None),
+        ("evaluations", evals, join.GROUP_VARS),
+    ]
+    return df, sources
+
+
+def legacy_join(df, sources):
+    """Merge each source in turn as main.merge did"""
+
+    for _, other, on in sources:
+        if on is None:
+            df = pd.concat([df, other], axis=1)
+            continue
+        helper.share_categories([df, other], on)
+        df = df.merge(other, on=on, how="left")
+    return df
+
+
+def copies(df, sources):
+    """Copy the overview and sources, as the joins may change them
+
+    Args:
+        df (DataFrame): The course overview
+        sources (list): The sources
+
+    Returns:
+        tuple: The copies
+    """
+
+    return df.copy(), [(n, o.copy(), on) for n, o, on in sources]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'join':>8} {'seconds':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        df, sources = overview(rows)
+        results = {}
+        for func in [legacy_join, join.main]:
+            seconds = harness.best(
+                func, args.repeat, lambda: copies(df, sources)
+            )
+            _, peak, results[func] = harness.traced(func, *copies(df, sources))
+            name = "legacy" if func is legacy_join else "single"
+            print(f"{rows:>8} {name:>8} {seconds:>8.3f} {peak:>8.0f}")
+
+        # Both joins give the same values
+        legacy, single = results[legacy_join], results[join.main]
+        columns = [c for c in single.columns if c not in join.GROUP_VARS]
+        harness.assert_same(
+            legacy[columns],
+            single[columns],
+            check_dtype=False,
+            check_categorical=False,
+        )
+
+
+if __name__ == "__main__":
+    main()
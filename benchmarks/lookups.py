@@ -0,0 +1,75 @@
+"""Benchmark the vectorized lookups against mapping the scalar functions
+
+Run from the repository root with ``python -m benchmarks.lookups``
+"""
+
+import argparse
+import timeit
+import numpy as np
+import pandas as pd
+from src import helper
+
+
+def synthetic(rows, seed=0):
+    """Create synthetic sections, quarters and notes
+
+    Args:
+        rows (int): The number of rows
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        dict: The name of each lookup and its inputs
+    """
+
+    rng = np.random.default_rng(seed)
+    notes = list(helper.NOTE_MODALITIES) + ["", "Cross-listed"]
+    return {
+        "program": pd.Series(rng.integers(0, 100, rows)),
+        "quarter": pd.Series(rng.choice(list(helper.QTR_QUARTERS), rows)),
+        "modality": pd.Series(rng.choice(notes, rows)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10**6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = synthetic(args.rows)
+    lookups = {
+        "program": (helper.section_to_program, helper.programs),
+        "quarter": (helper.qtr_to_quarter, helper.quarters),
+        "modality": (helper.modality, helper.modalities),
+    }
+
+    print(f"{'lookup':>8} {'map (ns/row)':>13} {'vector (ns/row)':>16}")
+    for name, (scalar, vector) in lookups.items():
+        values = inputs[name]
+
+        # The quarter spellings mix integers and strings, so map the
+        # scalar function over the original values
+        if name == "quarter":
+            values = values.map(lambda q: int(q) if q.isdigit() else q)
+
+        # Check that both paths agree before timing them
+        mapped = values.map(scalar).astype(object)
+        vectorized = pd.Series(vector(values)).astype(object)
+        pd.testing.assert_series_equal(mapped, vectorized)
+
+        t_map = min(
+            timeit.repeat(
+                lambda: values.map(scalar), number=1, repeat=args.repeat
+            )
+        )
+        t_vector = min(
+            timeit.repeat(lambda: vector(values), number=1, repeat=args.repeat)
+        )
+        per_row = 1e9 / len(values)
+        print(
+            f"{name:>8} {t_map * per_row:>13.1f} {t_vector * per_row:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
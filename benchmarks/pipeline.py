@@ -0,0 +1,252 @@
+"""Time each reader, the summaries and the whole pipeline on synthetic data
+
+Run from the repository root with ``python -m benchmarks.pipeline``. The
+timings are saved to benchmarks/results and can be compared with an
+earlier run to spot regressions.
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import main as pipeline
+from src import (
+    booth_schedule,
+    cache,
+    course_evals,
+    helper,
+    price_history,
+    requirements,
+    trends,
+)
+from . import synthetic
+
+# Store where the data and results are kept
+DATA = os.path.join("benchmarks", "data")
+RESULTS = os.path.join("benchmarks", "results")
+
+
+def targets():
+    """Name the functions timed at each scale
+
+    Each target is a pair of a function returning the inputs and the
+    function timed on them, called from the data directory, which returns
+    the df whose rows are reported. The inputs are only read for the
+    targets that are timed, and once for all of them.
+
+    Returns:
+        dict: The inputs and function timed for each name
+    """
+
+    @functools.lru_cache(maxsize=None)
+    def courses():
+        schedule = booth_schedule.read(booth_schedule.FNAME)
+        return schedule["Course"].unique()
+
+    @functools.lru_cache(maxsize=None)
+    def prices():
+        return price_history.read(price_history.FNAME)
+
+    def dictionary():
+        return requirements.read(requirements.FNAMES[0])
+
+    group_vars = ["Course", "Program", "Instructor ID"]
+    return {
+        "booth_schedule.main": (tuple, booth_schedule.main),
+        "price_history.main": (tuple, price_history.main),
+        "course_evals.main": (tuple, course_evals.main),
+        "requirements.main": (lambda: (courses(),), requirements.main),
+        "requirements.fill": (
+            lambda: (courses(), dictionary()),
+            requirements.fill,
+        ),
+        "helper.summarize": (
+            lambda: (prices(), group_vars),
+            helper.summarize,
+        ),
+        "trends.main": (lambda: (prices(),), trends.main),
+        "main.main": (tuple, pipeline.main),
+    }
+
+
+def measure(func, repeat, inputs=tuple):
+    """Time repeated calls of a function
+
+    Args:
+        func (function): The function to time
+        repeat (int): The number of calls
+        inputs (function, optional): Returns the arguments of func, read
+            once before the calls. Defaults to no arguments.
+
+    Returns:
+        dict: The fastest and median time and the rows of the result
+    """
+
+    args = inputs()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "rows": len(result) if isinstance(result, pd.DataFrame) else None,
+    }
+
+
+def run(scale, repeat, only=None):
+    """Time every target on the data of a scale
+
+    Readers run without the cache so that each call reads the files, and
+    main.main is timed both from scratch and with a warm cache.
+
+    Args:
+        scale (int): The multiple of the usual size
+        repeat (int): The number of calls of each target
+        only (list, optional): The names of the targets to time. Defaults
+            to None, which times all of them.
+
+    Returns:
+        dict: The timings of each target
+    """
+
+    directory = os.path.abspath(os.path.join(DATA, f"scale_{scale}"))
+    if not os.path.exists(os.path.join(directory, "data")):
+        print(f"Generating scale {scale} data in {directory}")
+        synthetic.generate(directory, scale)
+
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache.configure(enabled=False, directory=tmp)
+            for name, (inputs, func) in targets().items():
+                if only and name not in only:
+                    continue
+                results[name] = measure(func, repeat, inputs)
+                print(f"{scale:>5}x {name:<22} {results[name]['min_s']:.3f} s")
+
+            # Time a run where nothing changed since the last one
+            if not only or "main.main (cached)" in only:
+                cache.configure(enabled=True)
+                pipeline.main()
+                name = "main.main (cached)"
+                results[name] = measure(pipeline.main, repeat)
+                print(f"{scale:>5}x {name:<22} {results[name]['min_s']:.3f} s")
+    finally:
+        cache.configure(enabled=True, directory="cache")
+        os.chdir(cwd)
+    return results
+
+
+def environment():
+    """Describe the machine and code being timed
+
+    Returns:
+        dict: The versions of python, the packages and the commit
+    """
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(results, fname, tolerance):
+    """Print the change in time against an earlier run
+
+    Args:
+        results (dict): The timings of each scale and target
+        fname (str): The name of the earlier results file
+        tolerance (float): The relative slowdown flagged as a regression
+
+    Returns:
+        int: The number of regressions
+    """
+
+    with open(fname, "r") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = 0
+    print(f"\nCompared with {fname}")
+    for scale, timings in results.items():
+        for name, timing in timings.items():
+            before = baseline.get(scale, {}).get(name)
+            if before is None:
+                continue
+            ratio = timing["min_s"] / before["min_s"]
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{scale:>5}x {name:<22} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--only", nargs="+", default=None, help="the targets to time"
+    )
+    parser.add_argument(
+        "--name",
+        default=None,
+        help="the name of the results file, defaulting to the time",
+    )
+    parser.add_argument(
+        "--compare", default=None, help="an earlier results file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="the relative slowdown flagged as a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        str(scale): run(scale, args.repeat, args.only) for scale in args.scale
+    }
+
+    # Save the timings for later comparisons
+    name = args.name or datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    fname = os.path.join(RESULTS, f"{name}.json")
+    os.makedirs(RESULTS, exist_ok=True)
+    with open(fname, "w") as f:
+        json.dump(
+            {"environment": environment(), "results": results}, f, indent=2
+        )
+    print(f"Saved results to {fname}")
+
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.tolerance)
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the requirements matrix against the per-course lookup
+
+Run from the repository root with ``python -m benchmarks.requirements_fill``
+"""
+
+import argparse
+import timeit
+import numpy as np
+import pandas as pd
+from src import requirements
+
+
+def synthetic(n_courses, n_areas, per_area, seed=0):
+    """Create a synthetic catalog and requirements dictionary
+
+    Args:
+        n_courses (int): The number of course numbers
+        n_areas (int): The number of requirement areas
+        per_area (int): The number of courses listed in each area
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        tuple: The courses and the requirements dictionary
+    """
+
+    rng = np.random.default_rng(seed)
+    courses = rng.choice(np.arange(10000, 99999), n_courses, replace=False)
+    dictionary = {
+        f"Area {a}": [int(c) for c in rng.choice(courses, per_area)]
+        for a in range(n_areas)
+    }
+    return courses, dictionary
+
+
+def legacy_fill(courses, dictionary):
+    """Fill the requirements one course at a time as before the matrix"""
+
+    df = pd.concat([requirements.lookup(c, dictionary) for c in courses])
+    df = df.replace(True, 1)
+    df = df.replace(False, np.nan)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--areas", type=int, default=200)
+    parser.add_argument("--per-area", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'courses':>8} {'areas':>6} {'lookup (s)':>11} {'matrix (s)':>11}")
+    for n in args.courses:
+        courses, dictionary = synthetic(n, args.areas, args.per_area)
+
+        # Check that both paths agree before timing them
+        old = legacy_fill(courses, dictionary).reset_index(drop=True)
+        new = requirements.fill(courses, dictionary)
+        pd.testing.assert_frame_equal(
+            old.astype(float), new.astype(float), check_dtype=False
+        )
+
+        t_old = min(
+            timeit.repeat(
+                lambda: legacy_fill(courses, dictionary),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        t_new = min(
+            timeit.repeat(
+                lambda: requirements.fill(courses, dictionary),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"{n:>8} {args.areas:>6} {t_old:>11.4f} {t_new:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
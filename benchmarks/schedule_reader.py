@@ -0,0 +1,76 @@
+"""Benchmark the streaming schedule reader against openpyxl
+
+Run from the repository root with ``python -m benchmarks.schedule_reader``
+"""
+
+import argparse
+import os
+import tempfile
+import numpy as np
+import openpyxl
+import pandas as pd
+from src import xlsx
+from . import harness, synthetic
+
+
+def generate(fname, rows, seed=0):
+    """Write a synthetic BoothSchedule with syllabus hyperlinks
+
+    Args:
+        fname (str): The name of the file
+        rows (int): The number of sections
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    rng = np.random.default_rng(seed)
+    synthetic.schedule(rng, synthetic.catalog(rng, 1), rows, fname)
+
+
+def legacy_read(fname):
+    """Read the values with pandas and the hyperlinks with openpyxl"""
+
+    df = pd.read_excel(fname)
+    wb = openpyxl.load_workbook(fname)
+    ws = wb["Sheet1"]
+    links = []
+    for r in range(2, len(ws["L"]) + 1):
+        try:
+            link = ws.cell(row=r, column=12).hyperlink.target
+        except AttributeError:
+            link = ""
+        links.append(link)
+    wb.close()
+    df["Syllabus"] = pd.Series(links)
+    return df
+
+
+def streaming_read(fname):
+    """Read the values and hyperlinks in one streaming pass"""
+
+    return xlsx.read(fname, link_column="L")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    # Measure each reader in a fresh process so peak memory is comparable
+    print(f"{'rows':>8} {'reader':>10} {'seconds':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            fname = os.path.join(directory, f"schedule_{rows}.xlsx")
+            harness.spawned(generate, fname, rows)
+            results = {}
+            for reader in [legacy_read, streaming_read]:
+                seconds, peak, df = harness.isolated(reader, fname)
+                results[reader.__name__] = df
+                name = reader.__name__.split("_")[0]
+                print(f"{rows:>8} {name:>10} {seconds:>8.2f} {peak:>8.0f}")
+            harness.assert_same(
+                results["legacy_read"], results["streaming_read"]
+            )
+
+
+if __name__ == "__main__":
+    main()
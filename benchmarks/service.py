@@ -0,0 +1,131 @@
+"""Measure the latency of the planner service under concurrent requests
+
+Run from the repository root with ``python -m benchmarks.service``. The
+service runs on the scale 1 synthetic data, and the requests are repeated
+while a new export triggers a rebuild. The clients run as threads of the
+same process, so they share the interpreter with the service.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import main as pipeline
+from src import service
+from . import synthetic
+
+# Store the requests sent by each client in turn
+PATHS = [
+    "/courses?where=Quarter=Winter&limit=50",
+    "/courses?where=Program=Evening&where=Recommend%20Course%3E=3",
+    "/health",
+]
+
+
+def client(port, requests):
+    """Send requests over one connection
+
+    Args:
+        port (int): The port of the service
+        requests (int): The number of requests
+
+    Returns:
+        tuple: The latency of each request and the snapshot versions seen
+    """
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    latencies, versions = [], set()
+    for i in range(requests):
+        start = time.perf_counter()
+        connection.request("GET", PATHS[i % len(PATHS)])
+        body = json.loads(connection.getresponse().read())
+        latencies.append(time.perf_counter() - start)
+        versions.add(body["version"])
+    connection.close()
+    return latencies, versions
+
+
+def load(port, clients, requests):
+    """Send requests from several clients at once
+
+    Args:
+        port (int): The port of the service
+        clients (int): The number of concurrent clients
+        requests (int): The number of requests of each client
+
+    Returns:
+        tuple: The latencies and the snapshot versions seen
+    """
+
+    with ThreadPoolExecutor(clients) as executor:
+        results = list(
+            executor.map(lambda _: client(port, requests), range(clients))
+        )
+    latencies = sorted(t for result in results for t in result[0])
+    versions = set().union(*(result[1] for result in results))
+    return latencies, versions
+
+
+def summary(name, latencies, versions):
+    """Print the percentiles of the latencies
+
+    Args:
+        name (str): The name of the run
+        latencies (list): The sorted latencies in seconds
+        versions (set): The snapshot versions seen
+    """
+
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    print(
+        f"{name:<16} {len(latencies):>6} requests  "
+        f"p50 {1000 * statistics.median(latencies):6.2f} ms  "
+        f"p99 {1000 * p99:6.2f} ms  versions {sorted(versions)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    directory = os.path.abspath(os.path.join("benchmarks", "data", "scale_1"))
+    if not os.path.exists(os.path.join(directory, "data")):
+        synthetic.generate(directory, 1)
+    os.chdir(directory)
+
+    # Run the service on its own event loop in the background
+    server = service.Service(
+        pipeline.main, {"formats": ["xlsx"]}, interval=0.2
+    )
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(
+        target=loop.run_until_complete,
+        args=(server.serve("127.0.0.1", args.port),),
+        daemon=True,
+    )
+    thread.start()
+    while server.version < 1:
+        time.sleep(0.1)
+
+    summary("warm", *load(args.port, args.clients, args.requests))
+
+    # Add an export and keep querying while the service rebuilds
+    fname = os.path.join("data", "ExportReport_copy.csv")
+    shutil.copyfile(os.path.join("data", "ExportReport_MBA.csv"), fname)
+    try:
+        latencies, versions = load(args.port, args.clients, 4 * args.requests)
+        summary("during rebuild", latencies, versions)
+    finally:
+        os.remove(fname)
+
+
+if __name__ == "__main__":
+    main()
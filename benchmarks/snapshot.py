@@ -0,0 +1,63 @@
+"""Time reading columns back from the excel output and the Arrow snapshot
+
+Run from the repository root with ``python -m benchmarks.snapshot``. The
+pipeline is built once on the synthetic data of each scale, which needs
+pyarrow for the snapshot.
+"""
+
+import argparse
+import os
+import pandas as pd
+import main as pipeline
+from src import snapshot
+from . import harness, synthetic
+
+# Store the columns read back from each table
+COLUMNS = {
+    "Planner": ["Course", "Quarter", "Price for P1", "Recommend Course"],
+    "Price History": ["Course", "Year", "Quarter", "Price for P1"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not snapshot.available():
+        raise SystemExit("The snapshot benchmark needs pyarrow")
+
+    cwd = os.getcwd()
+    print(f"{'scale':>5} {'table':<14} {'rows':>8} {'reader':<16} {'s':>8}")
+    for scale in args.scale:
+        directory = os.path.abspath(
+            os.path.join("benchmarks", "data", f"scale_{scale}")
+        )
+        if not os.path.exists(os.path.join(directory, "data")):
+            synthetic.generate(directory, scale)
+        os.chdir(directory)
+        try:
+            pipeline.main()
+            excel = os.path.join("output", "booth_course_planner.xlsx")
+            for table, columns in COLUMNS.items():
+                rows = len(snapshot.read(table))
+                readers = {
+                    "excel columns": lambda: pd.read_excel(
+                        excel, table, usecols=columns
+                    ),
+                    "arrow columns": lambda: snapshot.load(table, columns),
+                    "arrow table": lambda: snapshot.load(table),
+                }
+                for name, func in readers.items():
+                    seconds = harness.best(func, args.repeat)
+                    print(
+                        f"{scale:>5} {table:<14} {rows:>8} {name:<16} "
+                        f"{seconds:>8.4f}"
+                    )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
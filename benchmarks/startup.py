@@ -0,0 +1,122 @@
+"""Check the startup time and imports of quick commands against a budget
+
+Run from the repository root with ``python -m benchmarks.startup``. Each
+command runs in a fresh interpreter with ``-X importtime`` on the scale 1
+synthetic data, after a build has filled the cache.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from . import synthetic
+
+# Store the commands that should start quickly
+COMMANDS = {
+    "help": ["--help"],
+    "cached build": ["--log-level", "WARNING"],
+    "query": ["query", "--where", "Quarter=Winter"],
+}
+
+# Store the modules that quick commands should never import
+FORBIDDEN = ["openpyxl", "xlrd", "xlsxwriter", "concurrent.futures.process"]
+
+
+def imports(stderr):
+    """Parse the output of -X importtime
+
+    Args:
+        stderr (str): The standard error of the command
+
+    Returns:
+        dict: The time in seconds spent importing each module itself
+    """
+
+    found = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:") :].split("|")
+        found[name.strip()] = int(own) / 1e6
+    return found
+
+
+def run(args, directory):
+    """Run main.py with -X importtime
+
+    Args:
+        args (list): The arguments to main.py
+        directory (str): The directory to run in
+
+    Returns:
+        tuple: The wall time and the import time of each module
+    """
+
+    script = os.path.abspath("main.py")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", script, *args],
+        cwd=directory,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, imports(process.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=1.0,
+        help="the largest wall time in seconds of each command",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    # Build once so that the commands find a filled cache
+    directory = os.path.abspath(os.path.join("benchmarks", "data", "scale_1"))
+    if not os.path.exists(os.path.join(directory, "data")):
+        synthetic.generate(directory, 1)
+    subprocess.run(
+        [sys.executable, os.path.abspath("main.py"), "--log-level", "ERROR"],
+        cwd=directory,
+        check=True,
+    )
+
+    failures = 0
+    for name, command in COMMANDS.items():
+        runs = [run(command, directory) for _ in range(args.repeat)]
+        wall, modules = min(runs, key=lambda r: r[0])
+        total = sum(modules.values())
+        forbidden = [
+            f
+            for f in FORBIDDEN
+            if any(m == f or m.startswith(f"{f}.") for m in modules)
+        ]
+        ok = wall <= args.budget and not forbidden
+        failures += not ok
+        print(
+            f"{name:<13} {wall:6.3f} s wall {total:6.3f} s importing "
+            f"{'ok' if ok else 'OVER BUDGET'}"
+        )
+
+        # Show the packages taking the longest to import
+        packages = {}
+        for module, seconds in modules.items():
+            package = module.split(".")[0]
+            packages[package] = packages.get(package, 0) + seconds
+        ranked = sorted(packages.items(), key=lambda item: -item[1])
+        for package, seconds in ranked[: args.top]:
+            print(f"{'':<13} {seconds:6.3f} s {package}")
+        if forbidden:
+            print(f"{'':<13} imported {', '.join(forbidden)}")
+
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
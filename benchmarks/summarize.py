@@ -0,0 +1,95 @@
+"""Benchmark helper.summarize against the copy-and-merge version
+
+Run from the repository root with ``python -m benchmarks.summarize``
+"""
+
+import argparse
+import copy
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from src import helper
+from . import harness
+
+
+def synthetic(rows, seed=0):
+    """Create a synthetic evaluation history
+
+    Args:
+        rows (int): The number of sections
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        DataFrame: The evaluation history
+    """
+
+    rng = np.random.default_rng(seed)
+    quarters = helper.QUARTERS
+    df = pd.DataFrame(
+        {
+            "Course": rng.integers(30000, 42000, rows),
+            "Title": "Course",
+            "Year": rng.integers(2010, 2022, rows),
+            "Quarter": [quarters[q] for q in rng.integers(0, 4, rows)],
+            "Program": rng.choice(["Full-Time", "Evening", "Weekend"], rows),
+            "Section": rng.integers(1, 90, rows),
+            "Last Name": rng.choice([f"Last{i}" for i in range(2000)], rows),
+            "First Name": "First",
+        }
+    )
+    for c in ["Hours Per Week", "Convey Clearly", "Recommend Course"]:
+        df[c] = rng.uniform(0, 5, rows).round(1)
+    return helper.encode(df)
+
+
+def legacy_summarize(df, group_vars):
+    """Summarize with the copy-and-merge implementation"""
+
+    # The legacy frames stored quarters as (number, name) tuples and the
+    # remaining columns as objects
+    df = df.astype({c: object for c in df.select_dtypes("category")})
+    df["Quarter"] = [(helper.QUARTERS.index(q) + 1, q) for q in df["Quarter"]]
+
+    df["Q"] = pd.Series(map(itemgetter(0), df["Quarter"])) / 4
+    df["YQ"] = df["Year"] + df["Q"]
+    df = df.drop(columns=["Q"])
+    df_last = copy.deepcopy(df)
+    sub_vars = copy.deepcopy(group_vars)
+    sub_vars.extend(["YQ"])
+    df_last = df_last[sub_vars]
+    df_last = df_last.groupby(group_vars, as_index=False).max()
+    df_merge = pd.merge(df, df_last, how="inner", on=sub_vars)
+    df_merge = df_merge.groupby(group_vars, as_index=False).median(
+        numeric_only=True
+    )
+    df_merge = df_merge.drop(columns=["YQ"])
+    drop_columns = [
+        c for c in helper.base if c in df_merge.columns and c not in group_vars
+    ]
+    return df_merge.drop(columns=drop_columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10**5, 10**6])
+    args = parser.parse_args()
+
+    group_vars = ["Course", "Program", "Last Name"]
+    print(f"{'rows':>8} {'version':>8} {'seconds':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        df = synthetic(rows)
+        results = []
+        for name, func in [
+            ("legacy", legacy_summarize),
+            ("kernel", helper.summarize),
+        ]:
+            seconds, peak, result = harness.traced(func, df.copy(), group_vars)
+            results.append(result)
+            print(f"{rows:>8} {name:>8} {seconds:>8.2f} {peak:>8.1f}")
+        legacy, kernel = results
+        kernel = kernel.astype({c: object for c in group_vars[1:]})
+        pd.testing.assert_frame_equal(legacy, kernel)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Generate synthetic data files in the layout of the intranet downloads
+
+Run from the repository root with ``python -m benchmarks.synthetic``
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# Store the number of rows of each file at a scale of 1
+SECTIONS = 1500
+COURSES = 600
+INSTRUCTORS = 400
+PRICE_ROWS = 12000
+HISTORICAL_ROWS = 8000
+NEW_ROWS = 4000
+DEGREE_AREAS = 20
+CONCENTRATION_AREAS = 15
+
+# Store the limits of the file formats
+XLS_ROWS = 60000
+XLSX_URLS = 65530
+
+# Store the spellings used by the source files
+QUARTERS = ["Autumn", "Winter", "Spring", "Summer"]
+PRICE_QUARTERS = ["AUT", "WIN", "SPR", "SUM"]
+SECTIONS_BY_PROGRAM = [1, 2, 3, 4, 50, 81, 82, 85, 86, 87, 88, 60, 30]
+DAYS = ["M", "T", "W", "TH", "F", "S", "MW", "TTH"]
+TIMES = [
+    "8:30AM-11:30AM",
+    "9:00AM-12:00PM",
+    "1:30PM-4:30PM",
+    "3:00PM-6:00PM",
+    "6:00PM-9:00PM",
+]
+NOTES = ["In-Person Only", "Remote-Only", "First half", "Second half", None]
+SYLLABLES = ["ka", "ro", "mi", "sel", "van", "dor", "li", "ber", "to", "na"]
+ACCENTED = ["Dubé", "Muñoz", "Łukasz", "Zoë"]
+FIRST = ["Ann", "Bob", "Chen", "Dee", "Eve", "Farid", "Gus", "Hana", "Ivo"]
+SUBJECTS = ["BUSN", "BUSN", "BUSN", "ECON"]
+
+
+def names(rng, n):
+    """Create distinct instructor names
+
+    Each last name spells a random number with one syllable per digit, and
+    the numbers grow with n so that any number of names can be drawn.
+
+    Args:
+        rng (Generator): The random generator
+        n (int): The number of names
+
+    Returns:
+        ndarray: Names such as "Karomi, Ann"
+    """
+
+    last = set()
+    while len(last) < n:
+        number = str(rng.integers(10, 10 * max(n, 100)))
+        last.add("".join(SYLLABLES[int(d)] for d in number).capitalize())
+    last = sorted(last)
+    last[: len(ACCENTED)] = ACCENTED
+    first = rng.choice(FIRST, n)
+    return np.array([f"{l}, {f}" for l, f in zip(last, first)], dtype=object)
+
+
+def catalog(rng, scale):
+    """Create the courses and instructors shared by all files
+
+    Args:
+        rng (Generator): The random generator
+        scale (int): The multiple of the usual size
+
+    Returns:
+        dict: The course numbers, titles and instructors
+    """
+
+    courses = rng.choice(
+        np.arange(30000, 30000 + 20 * COURSES * scale),
+        COURSES * scale,
+        replace=False,
+    )
+    words = np.array(["Corporate", "Finance", "Strategy", "Data", "Markets"])
+    titles = [" ".join(rng.choice(words, 3)) for _ in courses]
+    instructors = names(rng, INSTRUCTORS * scale)
+    return {
+        "courses": courses,
+        "titles": dict(zip(courses, titles)),
+        "instructors": instructors,
+        "teachers": rng.choice(instructors, (len(courses), 2)),
+        "sections": rng.choice(SECTIONS_BY_PROGRAM, (len(courses), 2)),
+    }
+
+
+def offerings(rng, shared, n):
+    """Draw course sections with the instructors that usually teach them
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        n (int): The number of sections
+
+    Returns:
+        tuple: The course numbers, section numbers and instructors
+    """
+
+    picks = rng.integers(0, len(shared["courses"]), n)
+    courses = shared["courses"][picks]
+    sections = shared["sections"][picks, rng.integers(0, 2, n)]
+    instructors = shared["teachers"][picks, rng.integers(0, 2, n)]
+
+    # Let a few sections be taught by anyone
+    anyone = rng.random(n) < 0.1
+    instructors[anyone] = rng.choice(shared["instructors"], anyone.sum())
+    return courses, sections, instructors
+
+
+def schedule(rng, shared, n, fname):
+    """Write a BoothSchedule.xlsx with syllabus hyperlinks
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        n (int): The number of sections
+        fname (str): The name of the file
+    """
+
+    courses, sections, instructors = offerings(rng, shared, n)
+    others = rng.choice(shared["courses"], (n, 2))
+    header = [
+        "Quarter",
+        "Section",
+        "Title",
+        "Instructor",
+        "Meeting Day/Time",
+        None,
+        None,
+        "Note",
+        "Prerequisites",
+        "Room",
+        "Credits",
+        "Course Syllabus",
+    ]
+
+    # Draw every column at once and write the rows in order
+    quarters = rng.choice(QUARTERS, n)
+    days = rng.choice(DAYS, n)
+    times = rng.choice(TIMES, n)
+    notes = rng.choice(np.array(NOTES, dtype=object), n)
+    kinds = rng.integers(0, 3, n)
+    rooms = rng.integers(100, 400, n)
+    linked = rng.random(n) < 0.7
+
+    wb = xlsxwriter.Workbook(fname, {"constant_memory": True})
+    ws = wb.add_worksheet("Sheet1")
+    ws.write_row(0, 0, header)
+    links = 0
+    for i, course in enumerate(courses):
+        prerequisites = [
+            None,
+            f"Business {others[i, 0]} or {others[i, 1]} required.",
+            "Students may not take this course if they have taken "
+            f"{others[i, 0]}.",
+        ][kinds[i]]
+        row = [
+            f"{quarters[i]} 2022",
+            f"{course}-{sections[i]:02d}",
+            shared["titles"][course],
+            instructors[i],
+            f"{days[i]} {times[i]}",
+            None,
+            None,
+            notes[i],
+            prerequisites,
+            f"HC {rooms[i]}",
+            100,
+        ]
+        ws.write_row(i + 1, 0, row)
+
+        # Link most syllabi, within the hyperlink limit of a worksheet
+        if links < XLSX_URLS and linked[i]:
+            url = f"https://example.com/syllabus/{course}/{i}"
+            ws.write_url(i + 1, 11, url, string="Syllabus")
+            links += 1
+        else:
+            ws.write_string(i + 1, 11, "Syllabus")
+    wb.close()
+
+
+def price_history(rng, shared, scale, fname):
+    """Write a course price history.xls with one sheet per term
+
+    Sheets keep under the row limit of the xls format, so larger scales
+    add older terms rather than longer sheets.
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        scale (int): The multiple of the usual size
+        fname (str): The name of the file
+    """
+
+    import xlwt
+
+    total = PRICE_ROWS * scale
+    per_sheet = min(PRICE_ROWS // 12 * scale, XLS_ROWS)
+    header = [
+        "Course",
+        "Title",
+        "Instructor",
+        "Quarter",
+        "Year",
+        "Day and Time",
+        "Phase 1 Price",
+        "Total Enrollment after Phase 1",
+        "Seats Available after Phase 1",
+        "Phase 2 Price",
+        "Total Enrollment after Phase 2",
+        "Seats Available after Phase 2",
+        "New Students Phase 1 Price",
+    ]
+
+    book = xlwt.Workbook()
+    sheets = -(-total // per_sheet)
+    for s in range(sheets):
+        year = 2021 - s // 4
+        quarter = 3 - s % 4
+        sh = book.add_sheet(f"{PRICE_QUARTERS[quarter]} {year}")
+        sh.write(0, 0, "Course Price History")
+        for j, column in enumerate(header):
+            sh.write(1, j, column)
+
+        # Draw every column of the sheet at once
+        n = per_sheet
+        courses, sections, instructors = offerings(rng, shared, n)
+        instructors = instructors.astype(str)
+        katja = np.where(rng.random(n) < 0.05, " (Katja)", "")
+        cotaught = np.where(
+            rng.random(n) < 0.05,
+            np.char.add(
+                "; ", rng.choice(shared["instructors"], n).astype(str)
+            ),
+            "",
+        )
+        instructors = np.char.add(np.char.add(instructors, katja), cotaught)
+        meetings = np.char.add(
+            np.char.add(rng.choice(DAYS, n), " "),
+            [t.split("-")[0] for t in rng.choice(TIMES, n)],
+        )
+        prices = rng.gamma(1.0, 600 + 50 * (courses % 7)).astype(int)
+        sold = rng.random(n) < 0.3
+        closed = sold & (rng.random(n) < 0.2)
+        columns = [
+            [f"{c}-{x:02d}" for c, x in zip(courses, sections)],
+            [shared["titles"][c] for c in courses],
+            instructors.tolist(),
+            [PRICE_QUARTERS[quarter]] * n,
+            [year] * n,
+            meetings.tolist(),
+            np.where(closed, "CLO", prices.astype(str)).tolist(),
+            rng.integers(10, 65, n).tolist(),
+            np.where(sold, 0, rng.integers(1, 20, n)).tolist(),
+            (prices * rng.random(n) / 4).astype(int).tolist(),
+            rng.integers(10, 65, n).tolist(),
+            rng.integers(0, 10, n).tolist(),
+            rng.integers(0, 50, n).tolist(),
+        ]
+
+        # Keep prices numeric apart from the CLO markers
+        columns[6] = [v if v == "CLO" else int(v) for v in columns[6]]
+        for r, row in enumerate(zip(*columns)):
+            for j, value in enumerate(row):
+                sh.write(r + 2, j, value)
+    book.save(fname)
+
+
+def evaluations(rng, shared, scale, fname):
+    """Write a course_evals.xlsx of historical evaluations
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        scale (int): The multiple of the usual size
+        fname (str): The name of the file
+    """
+
+    n = HISTORICAL_ROWS * scale
+    courses, sections, instructors = offerings(rng, shared, n)
+    suffix = rng.choice(["", "", "", " (Lecturer)"], n)
+    df = pd.DataFrame(
+        {
+            "Course": courses,
+            "Title": [shared["titles"][c] for c in courses],
+            "YR": rng.integers(2010, 2020, n),
+            "QTR": rng.integers(0, 4, n),
+            "SECT": sections,
+            "Instructor": np.char.add(instructors.astype(str), suffix),
+            "ENRL": rng.integers(10, 70, n),
+            "% RESP": rng.uniform(0.2, 1, n).round(3),
+            "Q. 1 HRS /WK": rng.uniform(2, 12, n).round(2),
+        }
+    )
+    questions = [
+        "Q. 2 CONVEY CLEAR",
+        "Q. 3 CONVEY INTRST",
+        "Q. 4 USEFUL TOOLS",
+        "Q. 5 OUT OF COURSE",
+        "Q. 6 REC COURSE",
+    ]
+    for question in questions:
+        df[question] = rng.uniform(2.5, 5, n).round(2)
+    df.to_excel(fname, index=False, engine="xlsxwriter")
+
+
+def new_evaluations(rng, shared, n, fname, subjects=SUBJECTS):
+    """Write an ExportReport_MBA.csv of new evaluations
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        n (int): The number of evaluations
+        fname (str): The name of the file
+        subjects (list, optional): The departments drawn for each
+            evaluation, where only BUSN is kept by the reader. Defaults to
+            SUBJECTS.
+    """
+
+    courses, sections, instructors = offerings(rng, shared, n)
+    subjects = rng.choice(subjects, n)
+    last, first = zip(*(s.split(", ") for s in instructors))
+    invites = rng.integers(10, 70, n)
+    responses = (invites * rng.uniform(0.2, 1, n)).astype(int)
+    df = pd.DataFrame(
+        {
+            "Course Title": [
+                f"{s} {c} {x:02d}"
+                for s, c, x in zip(subjects, courses, sections)
+            ],
+            "Courses - LONG_CLASS_TITLE": [
+                shared["titles"][c] for c in courses
+            ],
+            "Quarter": [
+                f"{q} {y}"
+                for q, y in zip(
+                    rng.choice(QUARTERS, n), rng.integers(2020, 2022, n)
+                )
+            ],
+            "Last Name": last,
+            "First Name": first,
+            "Invites": invites,
+            "Resp.": responses,
+            "%Resp": (100 * responses / invites).round(1),
+            "Q1 Average Number of Hours Per Week Spent in Preparation": (
+                rng.uniform(2, 12, n).round(2)
+            ),
+        }
+    )
+    questions = [
+        "Q2 Info Clearly Conveyed",
+        "Q3 Info Conveyed In an Interesting Way",
+        "Q4 Acquired Useful Tools",
+        "Q5 Amount Learned from Course",
+        "Q6 Recommend Course to Others",
+    ]
+    for question in questions:
+        df[question] = rng.uniform(2.5, 5, n).round(2)
+    df.to_csv(fname, index=False)
+
+
+def requirements(rng, shared, areas, prefix, fname):
+    """Write a requirements file of "Area: Course, Course" lines
+
+    Args:
+        rng (Generator): The random generator
+        shared (dict): The catalog
+        areas (int): The number of areas
+        prefix (str): The start of each area name
+        fname (str): The name of the file
+    """
+
+    with open(fname, "w") as f:
+        for area in range(areas):
+            size = min(int(rng.integers(10, 40)), len(shared["courses"]))
+            courses = rng.choice(shared["courses"], size, replace=False)
+            f.write(f"{prefix} {area}: {', '.join(map(str, courses))}\n")
+
+
+def generate(directory, scale=1, seed=0):
+    """Write every data file read by main.py
+
+    Args:
+        directory (str): The directory receiving the data folder
+        scale (int, optional): The multiple of the usual size. Defaults
+            to 1.
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    rng = np.random.default_rng(seed)
+    data = os.path.join(directory, "data")
+    os.makedirs(data, exist_ok=True)
+    shared = catalog(rng, scale)
+
+    schedule(
+        rng, shared, SECTIONS * scale, os.path.join(data, "BoothSchedule.xlsx")
+    )
+    price_history(
+        rng, shared, scale, os.path.join(data, "course price history.xls")
+    )
+    evaluations(rng, shared, scale, os.path.join(data, "course_evals.xlsx"))
+    new_evaluations(
+        rng,
+        shared,
+        NEW_ROWS * scale,
+        os.path.join(data, "ExportReport_MBA.csv"),
+    )
+    requirements(
+        rng,
+        shared,
+        DEGREE_AREAS,
+        "Degree",
+        os.path.join(data, "degree_requirements.txt"),
+    )
+    requirements(
+        rng,
+        shared,
+        CONCENTRATION_AREAS,
+        "Concentration",
+        os.path.join(data, "concentration_requirements.txt"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--directory",
+        default=None,
+        help="defaults to benchmarks/data/scale_<scale>",
+    )
+    args = parser.parse_args()
+
+    directory = args.directory or os.path.join(
+        "benchmarks", "data", f"scale_{args.scale}"
+    )
+    generate(directory, args.scale, args.seed)
+    print(f"Wrote synthetic data to {os.path.join(directory, 'data')}")
+
+
+if __name__ == "__main__":
+    main()
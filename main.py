@@ -1,58 +1,646 @@
+import argparse
+import difflib
+import logging
 import os
-import pandas as pd
-from src import (
-    helper,
-    booth_schedule,
-    requirements,
-    price_history,
-    course_evals,
-)
+import time
 
+# The src modules are imported by the commands that use them, so that
+# queries and cached runs do not pay for importing every reader
 
-def main():
+
+def ingest(manifest, workers=1):
+    """Read the course schedule, price history and course evaluations
+
+    Only the files that changed since the last run are read again.
+
+    Args:
+        manifest (Manifest): The stages of the build
+        workers (int, optional): The number of worker processes reading the
+            files in parallel. Defaults to 1.
+
+    Returns:
+        tuple: The schedule, price history and course evaluations
+    """
+
+    from src import build, instrument, parallel
+    from src import booth_schedule, price_history, course_evals
+
+    # Store the reader of each stage, its files and whether it splits the
+    # files across workers itself
+    stages = {
+        "schedule": (booth_schedule.main, [booth_schedule.FNAME], False),
+        "prices": (price_history.main, [price_history.FNAME], True),
+        "evals": (
+            course_evals.main,
+            [fname for _, fname in course_evals.sources()],
+            True,
+        ),
+    }
+
+    # Load the unchanged stages and read the others in parallel
+    results = {}
+    for name, (func, fnames, _) in stages.items():
+        results[name] = manifest.check(name, func, build.files(fnames))
+    pending = [name for name, result in results.items() if result is None]
+
+    # Give the workers to a lone stage, since the stages running in the
+    # pool would otherwise each start a pool of their own
+    nested = workers if len(pending) == 1 else 1
+    tasks = []
+    for name in pending:
+        func, _, split = stages[name]
+        tasks.append(
+            (instrument.run, name, func, *([nested] if split else []))
+        )
+    for name, result in zip(pending, parallel.run(tasks, workers)):
+        manifest.record(name, result)
+        results[name] = result
+
+    return results["schedule"], results["prices"], results["evals"]
+
+
+def main(
+    workers=1,
+    explain=False,
+    formats=("xlsx",),
+    skip_raw=False,
+    report=None,
+    price_window=4,
+    half_life=None,
+):
     """Create a course overview
 
+    Each stage is skipped when its inputs did not change since the last
+    run, as recorded in output/manifest.json.
+
+    Args:
+        workers (int, optional): The number of worker processes reading the
+            files in parallel. Defaults to 1.
+        explain (bool, optional): Whether to print which stages ran and
+            why. Defaults to False.
+        formats (list, optional): The formats to write. Defaults to xlsx.
+        skip_raw (bool, optional): Whether to leave out the raw price
+            history and course evaluations sheets. Defaults to False.
+        report (str, optional): The name of the JSON file receiving the
+            time, memory and rows of each stage. Defaults to None.
+        price_window (int, optional): The number of recent terms whose
+            prices are summarized. Defaults to 4.
+        half_life (float, optional): The number of terms over which the
+            weight of an evaluation halves. Defaults to None, which weighs
+            every term the same.
+
     Returns:
         DataFrame: The merged course overview information
     """
 
-    # Open up the file
-    fname = os.path.join("output", "booth_course_planner.xlsx")
-    if os.path.exists(fname):
-        os.remove(fname)
-    writer = pd.ExcelWriter(fname, engine="xlsxwriter")
+    from src import build, forecast, helper, instrument, join, output
+    from src import planner, prerequisites, requirements, scores, snapshot
+    from src import trends
+
+    # Fail before the build when a format cannot be written
+    output.check(formats)
+    manifest = build.Manifest(os.path.join("output", "manifest.json"))
 
-    # Read the course schedule
-    df = booth_schedule.main()
+    # Read the course schedule, price history and course evaluations
+    df, prices, evals = ingest(manifest, workers)
 
-    # Create the degree/conc requirements and merge
+    # Create the degree/conc requirements
     courses = df["Course"].unique()
-    reqs = requirements.main(courses)
-    reqs.to_excel(writer, sheet_name="Requirements", index=False)
-    df = df.merge(reqs, on="Course")
-
-    # Read the price history, summarize, and merge
-    prices = price_history.main()
-    prices.to_excel(writer, sheet_name="Price History", index=False)
-    prices_group_vars = ["Course", "Program", "Last Name"]
-    prices = helper.summarize(prices, prices_group_vars)
-    df = df.merge(prices, on=prices_group_vars, how="left")
-
-    # Read the course evaluations, summarize, merge
-    evals = course_evals.main()
-    evals.to_excel(writer, sheet_name="Course Evaluations", index=False)
-    evals_group_vars = ["Course", "Program", "Last Name"]
-    evals = helper.summarize(evals, evals_group_vars)
-    df = df.merge(evals, on=evals_group_vars, how="left")
-
-    # Save the full df to the excel file
-    df.to_excel(writer, sheet_name="Planner", index=False)
-    writer.save()
-    print(f"Saved course planner to {fname}")
+    inputs = manifest.digests("schedule")
+    inputs.update(build.files(requirements.FNAMES))
+    reqs = manifest.run(
+        "requirements", requirements.main, courses, inputs=inputs
+    )
+
+    # Build the prerequisite graph of the courses
+    inputs = manifest.digests("schedule")
+    manifest.run("prerequisites", prerequisites.Graph, df, inputs=inputs)
+
+    # Summarize the price history
+    prices_group_vars = join.GROUP_VARS
+    inputs = manifest.digests("prices")
+    inputs["group_vars"] = prices_group_vars
+    prices_summary = manifest.run(
+        "prices summary",
+        helper.summarize,
+        prices,
+        prices_group_vars,
+        inputs=inputs,
+    )
+
+    # Summarize the recent terms of the price history
+    inputs = manifest.digests("prices")
+    inputs["window"] = price_window
+    price_trends = manifest.run(
+        "price trends", trends.main, prices, price_window, inputs=inputs
+    )
+
+    # Forecast the prices from the whole price history
+    inputs = manifest.digests("prices")
+    model = manifest.run(
+        "forecast",
+        forecast.fit,
+        prices,
+        manifest.load("forecast", forecast.fit),
+        inputs=inputs,
+    )
+    inputs = manifest.digests("schedule", "forecast")
+    forecasts = manifest.run(
+        "predict forecasts", forecast.main, df, model, inputs=inputs
+    )
+
+    # Summarize the course evaluations
+    evals_group_vars = join.GROUP_VARS
+    inputs = manifest.digests("evals")
+    inputs["group_vars"] = evals_group_vars
+    evals_summary = manifest.run(
+        "evals summary",
+        helper.summarize,
+        evals,
+        evals_group_vars,
+        inputs=inputs,
+    )
+
+    # Score each section from the evaluations of its course and instructor
+    inputs = manifest.digests("schedule", "evals")
+    inputs["half_life"] = half_life
+    evals_scores = manifest.run(
+        "evals scores", scores.main, df, evals, half_life, inputs=inputs
+    )
+
+    # Join the requirements, summaries and forecasts in a single pass
+    sources = [
+        ("requirements", reqs, ["Course"]),
+        ("prices", prices_summary, prices_group_vars),
+        ("price trends", price_trends, join.GROUP_VARS),
+        ("forecasts", forecasts, None),
+        ("evaluations", evals_summary, evals_group_vars),
+        ("evaluation scores", evals_scores, None),
+    ]
+    inputs = manifest.digests(
+        "schedule",
+        "requirements",
+        "prices summary",
+        "price trends",
+        "predict forecasts",
+        "evals summary",
+        "evals scores",
+    )
+    df = manifest.run("join", join.main, df, sources, inputs=inputs)
+
+    # Index the course overview for queries
+    inputs = manifest.digests("join")
+    manifest.run("index", planner.Planner, df, inputs=inputs)
+
+    # Save the sheets in each format
+    stem = os.path.join("output", "booth_course_planner")
+    sheets = {
+        "Requirements": reqs,
+        "Price History": prices,
+        "Course Evaluations": evals,
+        "Planner": df,
+    }
+    inputs = manifest.digests("requirements", "prices", "evals", "join")
+    inputs.update(formats=list(formats), skip_raw=skip_raw)
+    outputs = output.files(stem, output.select(sheets, skip_raw), formats)
+    manifest.run(
+        "write",
+        output.write,
+        stem,
+        sheets,
+        formats,
+        skip_raw,
+        inputs=inputs,
+        outputs=list(outputs),
+    )
+
+    # Save a memory-mappable snapshot of every sheet when pyarrow is installed
+    if snapshot.available():
+        inputs = manifest.digests("requirements", "prices", "evals", "join")
+        manifest.run(
+            "snapshot",
+            snapshot.write,
+            sheets,
+            inputs=inputs,
+            outputs=[os.path.join(snapshot.DIRECTORY, snapshot.CURRENT)],
+        )
+
+    manifest.save()
+    if explain:
+        manifest.explain()
+    if report is not None:
+        instrument.report(report, manifest.stages)
+    return df
+
+
+def query(expressions, columns=(), taken=()):
+    """Print the courses matching query expressions
+
+    Args:
+        expressions (list): The query expressions, as in planner.parse
+        columns (list, optional): Additional columns to show. Defaults to
+            ().
+        taken (list, optional): The courses already taken, keeping only the
+            courses whose prerequisites they satisfy. Defaults to ().
+
+    Returns:
+        DataFrame: The matching courses
+
+    Raises:
+        KeyError: If a column is not in the planner
+    """
+
+    from src import planner, prerequisites
+
+    indexed = planner.load()
+    graph = prerequisites.load() if taken else None
+    filters = planner.parse(expressions)
+
+    # Name the unknown columns with the closest known ones
+    for column in [*filters, *columns]:
+        if column not in indexed.df.columns:
+            close = difflib.get_close_matches(column, indexed.df.columns)
+            hint = f", did you mean {close[0]!r}?" if close else ""
+            raise KeyError(f"unknown column {column!r}{hint}")
+    start = time.perf_counter()
+    df = indexed.select(filters)
+    if graph is not None:
+        df = df[df["Course"].isin(graph.available(taken)).to_numpy(bool)]
+    elapsed = time.perf_counter() - start
+
+    # Show the filtered columns after the usual ones
+    shown = [c for c in planner.DISPLAY if c in df.columns]
+    shown.extend(c for c in [*filters, *columns] if c not in shown)
+    print(df[shown].to_string(index=False))
+    print(f"{len(df)} courses matched in {1000 * elapsed:.2f} ms")
+    return df
+
+
+def plan(quarter, program, areas, max_courses=4, top=10, cover=False):
+    """Print the best conflict-free bundles of courses
+
+    Args:
+        quarter (str): The quarter
+        program (str): The program
+        areas (list): The target requirement areas
+        max_courses (int, optional): The largest number of courses in a
+            bundle. Defaults to 4.
+        top (int, optional): The number of bundles to show. Defaults to 10.
+        cover (bool, optional): Whether every bundle must satisfy all the
+            target areas. Defaults to False.
+
+    Returns:
+        DataFrame: The courses of each bundle
+
+    Raises:
+        KeyError: If an area is not a requirement area of the planner
+    """
+
+    from src import bundles, planner, requirements
+
+    indexed = planner.load()
+
+    # Name the unknown areas with the closest known ones
+    known = [a for a in requirements.load() if a in indexed.df.columns]
+    for area in areas:
+        if area not in known:
+            close = difflib.get_close_matches(area, known)
+            hint = f", did you mean {close[0]!r}?" if close else ""
+            raise KeyError(f"unknown area {area!r}{hint}")
+    start = time.perf_counter()
+    df = bundles.solve(
+        indexed.df,
+        quarter,
+        program,
+        areas,
+        max_courses=max_courses,
+        top=top,
+        cover=cover,
+    )
+    elapsed = time.perf_counter() - start
+
+    shown = ["Bundle", "Bundle Value", *planner.DISPLAY]
+    shown.extend(["Recommend Course", "Price for P1", *areas])
+    print(df[[c for c in shown if c in df.columns]].to_string(index=False))
+    print(f"{df['Bundle'].nunique()} bundles found in {elapsed:.2f} s")
     return df
 
 
+def serve(host, port, interval, **kwargs):
+    """Serve the course planner over HTTP, rebuilding when data changes
+
+    Args:
+        host (str): The host to bind
+        port (int): The port to bind
+        interval (float): The seconds between checks of the data files
+        **kwargs: The arguments of each build, as in main
+    """
+
+    import asyncio
+    from src import service
+
+    server = service.Service(main, kwargs, interval=interval)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+def positive(arg):
+    """Parse a positive integer argument
+
+    Args:
+        arg (str): The argument
+
+    Returns:
+        int: The value of the argument
+    """
+
+    value = int(arg)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def positive_float(arg):
+    """Parse a positive number argument
+
+    Args:
+        arg (str): The argument
+
+    Returns:
+        float: The value of the argument
+    """
+
+    value = float(arg)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, not {value}")
+    return value
+
+
+def format_list(arg):
+    """Parse a comma-separated list of output formats
+
+    Args:
+        arg (str): The argument
+
+    Returns:
+        list: The formats, each known and with its libraries installed
+    """
+
+    from src import output
+
+    formats = arg.split(",")
+    try:
+        output.check(formats)
+    except (ValueError, ImportError) as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return formats
+
+
+def build_options(defaults=True):
+    """Create the options of a build shared by the commands that build
+
+    Args:
+        defaults (bool, optional): Whether to set the defaults. The
+            subcommands leave them out, so that options given before the
+            subcommand are kept. Defaults to True.
+
+    Returns:
+        ArgumentParser: The parent parser holding the options
+    """
+
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
+
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument(
+        "--workers",
+        type=int,
+        default=default(1),
+        help="the number of processes reading the data files in parallel",
+    )
+    options.add_argument(
+        "--explain",
+        action="store_true",
+        default=default(False),
+        help="print which stages ran and why",
+    )
+    options.add_argument(
+        "--formats",
+        type=format_list,
+        default=default(["xlsx"]),
+        help="comma-separated formats to write from xlsx, csv and parquet",
+    )
+    options.add_argument(
+        "--skip-raw",
+        action="store_true",
+        default=default(False),
+        help="leave out the raw price history and course evaluations",
+    )
+    options.add_argument(
+        "--price-window",
+        type=positive,
+        default=default(4),
+        metavar="TERMS",
+        help="the number of recent terms whose prices are summarized",
+    )
+    options.add_argument(
+        "--half-life",
+        type=positive_float,
+        default=default(None),
+        metavar="TERMS",
+        help="the number of terms over which the weight of an evaluation "
+        "halves, weighing every term the same when not given",
+    )
+    options.add_argument(
+        "--report",
+        default=default(None),
+        metavar="FILE",
+        help="write the time, peak memory and rows of each stage to a JSON "
+        "file, tracing memory during the run",
+    )
+    return options
+
+
+def build_parser():
+    """Build the parser of the command line arguments
+
+    Returns:
+        ArgumentParser: The parser
+    """
+
+    # Share the options of a build between the default command, build and
+    # serve, where only the top-level parser sets the defaults
+    options = build_options(defaults=False)
+    parser = argparse.ArgumentParser(
+        description="Create a course overview", parents=[build_options()]
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="read every data file from scratch without using the cache",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="read every data file from scratch and refresh the cache",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="write cProfile statistics of the command to a file",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="the level of the progress messages, where DEBUG also logs the "
+        "time of each stage",
+    )
+
+    # Build the course overview, which is also the default command
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser(
+        "build",
+        parents=[options],
+        help="create the course overview, as when no command is given",
+    )
+
+    # Query the planner built by the last run
+    parser_query = subparsers.add_parser(
+        "query", help="print the courses matching every --where expression"
+    )
+    parser_query.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="EXPRESSION",
+        help='a filter such as "Quarter=Winter", "Recommend Course>=4" or '
+        "a requirement area name",
+    )
+    parser_query.add_argument(
+        "--columns",
+        action="append",
+        default=[],
+        metavar="COLUMN",
+        help="an additional column to show",
+    )
+    parser_query.add_argument(
+        "--taken",
+        action="append",
+        type=int,
+        default=[],
+        metavar="COURSE",
+        help="a course already taken, keeping only the courses whose "
+        "prerequisites are met",
+    )
+
+    # Find the best bundles in the planner built by the last run
+    parser_bundles = subparsers.add_parser(
+        "bundles", help="print the best conflict-free bundles of courses"
+    )
+    parser_bundles.add_argument("--quarter", required=True)
+    parser_bundles.add_argument("--program", required=True)
+    parser_bundles.add_argument(
+        "--area",
+        action="append",
+        required=True,
+        metavar="AREA",
+        help="a target requirement area",
+    )
+    parser_bundles.add_argument(
+        "--max-courses",
+        type=int,
+        default=4,
+        help="the largest number of courses in a bundle",
+    )
+    parser_bundles.add_argument(
+        "--top", type=int, default=10, help="the number of bundles to show"
+    )
+    parser_bundles.add_argument(
+        "--cover",
+        action="store_true",
+        help="only show bundles satisfying every target area",
+    )
+
+    # Serve the planner over HTTP, rebuilding it when the data changes
+    parser_serve = subparsers.add_parser(
+        "serve",
+        parents=[options],
+        help="serve queries and course details as JSON over HTTP",
+    )
+    parser_serve.add_argument("--host", default="127.0.0.1")
+    parser_serve.add_argument("--port", type=int, default=8765)
+    parser_serve.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="the seconds between checks of the data files",
+    )
+    return parser
+
+
 if __name__ == "__main__":
 
-    df = main()
+    parser = build_parser()
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    from src import cache, instrument
+
+    cache.configure(enabled=not args.no_cache, rebuild=args.rebuild_cache)
+    instrument.configure(memory=args.report is not None)
+    if args.command == "query":
+        command = query
+        kwargs = dict(
+            expressions=args.where, columns=args.columns, taken=args.taken
+        )
+    elif args.command == "bundles":
+        command = plan
+        kwargs = dict(
+            quarter=args.quarter,
+            program=args.program,
+            areas=args.area,
+            max_courses=args.max_courses,
+            top=args.top,
+            cover=args.cover,
+        )
+    elif args.command == "serve":
+        command = serve
+        kwargs = dict(
+            host=args.host,
+            port=args.port,
+            interval=args.interval,
+            workers=args.workers,
+            formats=args.formats,
+            skip_raw=args.skip_raw,
+            price_window=args.price_window,
+            half_life=args.half_life,
+        )
+    else:
+        command = main
+        kwargs = dict(
+            workers=args.workers,
+            explain=args.explain,
+            formats=args.formats,
+            skip_raw=args.skip_raw,
+            report=args.report,
+            price_window=args.price_window,
+            half_life=args.half_life,
+        )
 
+    # Run the command, under the profiler if asked, reporting unknown query
+    # columns and bundle areas as usage errors and a missing planner plainly
+    try:
+        if args.profile is not None:
+            df = instrument.profile(args.profile, command, **kwargs)
+        else:
+            df = command(**kwargs)
+    except KeyError as error:
+        if command not in (query, plan):
+            raise
+        parser.error(error.args[0])
+    except FileNotFoundError as error:
+        if command not in (query, plan):
+            raise
+        parser.exit(1, f"{parser.prog}: {error}\n")
@@ -1,40 +1,57 @@
+import logging
 import os
 import numpy as np
-import pandas as pd
-import openpyxl
-from . import helper
+from . import cache, helper, instrument, xlsx
+
+logger = logging.getLogger(__name__)
+
+# Store the name of the schedule file
+FNAME = os.path.join("data", "BoothSchedule.xlsx")
 
 
 def main():
+    """Read the BoothSchedule file through the cache
+
+    Returns:
+        DataFrame: The cleaned BoothSchedule
+    """
+
+    return cache.load(read, FNAME)
+
+
+@instrument.timed
+def read(fname):
     """Read and clean the BoothSchedule file
 
+    Args:
+        fname (str): The name of the file
+
     Returns:
         DataFrame: The cleaned BoothSchedule
     """
 
     # Read the schedule file
-    fname = os.path.join("data", "BoothSchedule.xlsx")
-    print(f"Reading Booth Schedule from {fname}")
-    df = pd.read_excel(fname)
+    logger.info(f"Reading Booth Schedule from {fname}")
+    # Syllabi hyperlinks in column "L" are read in the same pass
+    df = xlsx.read(fname, link_column="L")
 
     # Break year and quarter
     df[["Quarter", "Year"]] = df["Quarter"].str.split(" ", expand=True)
     df["Year"] = df["Year"].astype(int)
-    df["Quarter"] = df["Quarter"].map(helper.qtr_to_quarter)
+    df["Quarter"] = helper.quarters(df["Quarter"])
 
     # Break course number and section and add program
     df[["Course", "Section"]] = df["Section"].str.split("-", expand=True)
     df["Course"] = df["Course"].astype(int)
     df["Section"] = df["Section"].astype(int)
-    df["Program"] = df["Section"].map(helper.section_to_program)
+    df["Program"] = helper.programs(df["Section"])
 
     # Break instructor into last and first name
-    df[["Last Name", "First Name"]] = df["Instructor"].str.split(
-        ", ", expand=True
-    )
+    df = df.join(helper.names(df["Instructor"]))
 
-    # Break apart day and time
-    df[["Day", "Time"]] = df["Meeting Day/Time"].str.split(" ", expand=True)
+    # Break apart day and time, keeping any trailing text with the time
+    meetings = df["Meeting Day/Time"]
+    df[["Day", "Time"]] = meetings.str.split(" ", n=1, expand=True)
     calendar_dict = {
         "M": "Monday",
         "T": "Tuesday",
@@ -48,10 +65,11 @@ def main():
     }
     df["Day"].replace(calendar_dict, inplace=True)
 
-    # TODO: Handle half week courses
-    # TODO: Handle pre-reqs and negative pre-reqs
-    # Get syllabi hyperlinks in column "L"
-    df["Syllabus"] = hyperlinks(fname)
+    # Find the half-quarter courses from the notes and meeting times
+    df["Session"] = helper.sessions(df["Note"], meetings)
+
+    # Move the syllabi hyperlinks after the derived columns
+    df["Syllabus"] = df.pop("Syllabus")
 
     # Remove unwanted columns
     df = df.drop(
@@ -67,6 +85,9 @@ def main():
     df["Note"] = df["Note"].map(helper.remove_ascii)
     df["Prerequisites"] = df["Prerequisites"].map(helper.remove_ascii)
 
+    # Encode the shared columns
+    df = helper.encode(df)
+
     # Order columns
     column_ordering = helper.column_ordering(df.columns)
     df = df[column_ordering]
@@ -76,23 +97,3 @@ def main():
     df = df.sort_values(column_sorting)
 
     return df
-
-
-def hyperlinks(fname):
-
-    # Open the workbook
-    wb = openpyxl.load_workbook(fname)
-    ws = wb["Sheet1"]
-
-    # Loop over each row and pull out the hyperlink
-    links = []
-    rows = len(ws["L"])
-    for r in range(2, rows + 1):
-        try:
-            link = ws.cell(row=r, column=12).hyperlink.target
-        except AttributeError:
-            link = ""
-        links.append(link)
-
-    wb.close()
-    return pd.Series(links)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+from . import cache, instrument
+
+
+class Manifest:
+    """Track the inputs of each pipeline stage across runs
+
+    A stage is skipped when its code and inputs match the last run and its
+    result is still in the cache.
+
+    Args:
+        fname (str): The name of the manifest file
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.previous = {}
+        if os.path.exists(fname):
+            with open(fname, "r") as f:
+                self.previous = json.load(f).get("stages", {})
+        self.stages = {}
+
+    def digests(self, *names):
+        """Get the digests of stages that already ran or were skipped
+
+        Args:
+            *names: The names of the stages
+
+        Returns:
+            dict: The digest of each stage
+        """
+
+        return {name: self.stages[name]["digest"] for name in names}
+
+    def check(self, name, func, inputs, outputs=()):
+        """Fingerprint a stage and load its result if it is unchanged
+
+        Args:
+            name (str): The name of the stage
+            func (function): The function producing the result
+            inputs (dict): The fingerprint of each input of the stage
+            outputs (list, optional): The files written by the stage.
+                Defaults to ().
+
+        Returns:
+            object: The result of the last run, or None if the stage must run
+        """
+
+        code = cache.code_version(func)
+        sha = hashlib.sha256(name.encode())
+        sha.update(code.encode())
+        sha.update(json.dumps(inputs, sort_keys=True).encode())
+        record = {"digest": sha.hexdigest(), "code": code, "inputs": inputs}
+        self.stages[name] = record
+
+        # Explain why the stage must run
+        previous = self.previous.get(name)
+        missing = [fname for fname in outputs if not os.path.exists(fname)]
+        if previous is None:
+            reason = "no previous run"
+        elif previous["code"] != code:
+            reason = "code changed"
+        elif previous["inputs"] != inputs:
+            changed = sorted(
+                k
+                for k in set(inputs) | set(previous["inputs"])
+                if inputs.get(k) != previous["inputs"].get(k)
+            )
+            reason = f"{', '.join(changed)} changed"
+        elif missing:
+            reason = f"{', '.join(missing)} missing"
+        else:
+            result = cache.get(record["digest"])
+            if result is not None:
+                record.update(status="skipped", reason="unchanged")
+                return result
+            reason = "no cached result"
+
+        record.update(status="ran", reason=reason)
+        return None
+
+    def load(self, name, func=None):
+        """Load the result of a stage from the last run
+
+        Args:
+            name (str): The name of the stage
+            func (function, optional): The function producing the result,
+                whose code must not have changed. Defaults to None.
+
+        Returns:
+            object: The cached result, or None if it is not available
+        """
+
+        previous = self.previous.get(name)
+        if previous is None:
+            return None
+        if func is not None and previous["code"] != cache.code_version(func):
+            return None
+        return cache.get(previous["digest"])
+
+    def require(self, name, func, description):
+        """Load the result of a stage from the last run for a command
+
+        Args:
+            name (str): The name of the stage
+            func (function): The function producing the result, whose code
+                must not have changed
+            description (str): What the result is, such as "indexed
+                planner"
+
+        Returns:
+            object: The cached result
+
+        Raises:
+            FileNotFoundError: If the result is not available, saying why
+        """
+
+        result = self.load(name, func)
+        if result is not None:
+            return result
+        previous = self.previous.get(name)
+        if previous is None:
+            reason = "no build has run yet, run python main.py first"
+        elif previous["code"] != cache.code_version(func):
+            reason = "the code changed since the last build, run python "
+            reason += "main.py again"
+        elif not cache.settings["enabled"] or cache.settings["rebuild"]:
+            reason = "--no-cache and --rebuild-cache do not read the cache"
+        else:
+            reason = "the last build did not cache it, as with --no-cache, "
+            reason += "or it was evicted, run python main.py again"
+        raise FileNotFoundError(f"No {description} is available: {reason}")
+
+    def record(self, name, result):
+        """Store the result of a stage that ran
+
+        Args:
+            name (str): The name of the stage
+            result (object): The result of the stage
+        """
+
+        cache.put(self.stages[name]["digest"], result)
+
+    def run(self, name, func, *args, inputs=None, outputs=()):
+        """Run a stage unless it is unchanged since the last run
+
+        Args:
+            name (str): The name of the stage
+            func (function): The function producing the result
+            *args: The arguments to func
+            inputs (dict, optional): The fingerprint of each input of the
+                stage. Defaults to None.
+            outputs (list, optional): The files written by the stage.
+                Defaults to ().
+
+        Returns:
+            object: The result of func(*args)
+        """
+
+        with instrument.measure(name, args) as measurement:
+            result = self.check(name, func, inputs or {}, outputs)
+            if result is None:
+                result = func(*args)
+                self.record(name, result)
+            measurement["status"] = self.stages[name]["status"]
+            instrument.describe(measurement, result)
+        return result
+
+    def save(self):
+        """Write the manifest file"""
+
+        os.makedirs(os.path.dirname(self.fname) or ".", exist_ok=True)
+        with open(self.fname, "w") as f:
+            json.dump({"stages": self.stages}, f, indent=2)
+
+    def explain(self):
+        """Print which stages ran and why"""
+
+        width = max((len(name) for name in self.stages), default=0)
+        for name, record in self.stages.items():
+            print(
+                f"{name:<{width}}  {record['status']:<7}  {record['reason']}"
+            )
+
+
+def files(fnames):
+    """Fingerprint the contents of input files
+
+    Args:
+        fnames (list): The names of the files
+
+    Returns:
+        dict: The content hash of each file
+    """
+
+    return {fname: cache.fingerprint(fname)["sha256"] for fname in fnames}
@@ -0,0 +1,306 @@
+import heapq
+import re
+import numpy as np
+import pandas as pd
+
+# Store the days of the week in the order of the time slots
+DAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+# Store the length of a time slot in minutes
+SLOT = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT
+
+# Store the halves of the quarter met by each session as bits
+SESSION_HALVES = {"Full": 3, "First Half": 1, "Second Half": 2}
+
+# Match times such as "6:00PM-9:00PM" or "8:30-11:30AM"
+TIME = re.compile(
+    r"(\d{1,2}):(\d{2})\s*([AP]M)?\s*-\s*(\d{1,2}):(\d{2})\s*([AP]M)",
+    re.IGNORECASE,
+)
+
+
+def minutes(hour, minute, meridiem):
+    """Convert a clock time to minutes after midnight
+
+    Args:
+        hour (str): The hour on a 12 hour clock
+        minute (str): The minute
+        meridiem (str): Either AM or PM
+
+    Returns:
+        int: The minutes after midnight
+    """
+
+    hour = int(hour) % 12
+    if meridiem.upper() == "PM":
+        hour += 12
+    return 60 * hour + int(minute)
+
+
+def interval(time):
+    """Parse a meeting time into minutes after midnight
+
+    Args:
+        time (str): The meeting time
+
+    Returns:
+        tuple: The start and end minutes, or None if it cannot be parsed
+    """
+
+    match = TIME.search(time) if isinstance(time, str) else None
+    if match is None:
+        return None
+
+    h0, m0, ampm0, h1, m1, ampm1 = match.groups()
+    end = minutes(h1, m1, ampm1)
+    start = minutes(h0, m0, ampm0 or ampm1)
+
+    # A start without AM/PM takes the end's, unless it would be later
+    if ampm0 is None and start > end:
+        start -= 12 * 60
+    return start, end
+
+
+def slots(days, times):
+    """Mark the weekly time slots taken by each section
+
+    Args:
+        days (Series): The meeting days, such as "Monday/Wednesday"
+        times (Series): The meeting times, such as "6:00PM-9:00PM"
+
+    Returns:
+        ndarray: A boolean matrix with one row per section and one column
+            per time slot of the week
+    """
+
+    taken = np.zeros((len(days), 7 * SLOTS_PER_DAY), dtype=bool)
+    days = pd.Series(days).astype(object).to_numpy()
+    times = pd.Series(times).astype(object).to_numpy()
+    for i, (day, time) in enumerate(zip(days, times)):
+        bounds = interval(time)
+        if bounds is None or not isinstance(day, str):
+            continue
+        first = bounds[0] // SLOT
+        last = -(-bounds[1] // SLOT)
+        for name in day.split("/"):
+            if name in DAYS:
+                offset = DAYS.index(name) * SLOTS_PER_DAY
+                taken[i, offset + first : offset + last] = True
+    return taken
+
+
+def bitsets(matrix):
+    """Encode each row of a boolean matrix as an integer bitset
+
+    Args:
+        matrix (ndarray): The boolean matrix
+
+    Returns:
+        list: The bitset of each row, where bit j is column j
+    """
+
+    packed = np.packbits(matrix, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+def conflicts(df):
+    """Find the sections that cannot be taken together
+
+    Two sections conflict when their meeting times overlap in the same
+    half of the quarter or when they are sections of the same course.
+
+    Args:
+        df (DataFrame): The sections with Course, Day, Time and optionally
+            Session
+
+    Returns:
+        list: The bitset of sections conflicting with each section
+    """
+
+    taken = slots(df["Day"], df["Time"]).astype(np.float32)
+    overlap = (taken @ taken.T) > 0
+    if "Session" in df.columns:
+        halves = (
+            df["Session"]
+            .astype(object)
+            .map(SESSION_HALVES)
+            .fillna(3)
+            .to_numpy(int)
+        )
+        overlap &= (halves[:, None] & halves[None, :]) > 0
+    courses = df["Course"].to_numpy()
+    overlap |= courses[:, None] == courses[None, :]
+    np.fill_diagonal(overlap, True)
+    return bitsets(overlap)
+
+
+def candidates(df, quarter, program, areas):
+    """Select the sections satisfying any of the target areas
+
+    Args:
+        df (DataFrame): The course overview
+        quarter (str): The quarter
+        program (str): The program
+        areas (list): The target requirement areas
+
+    Returns:
+        DataFrame: The candidate sections
+    """
+
+    mask = (df["Quarter"] == quarter) & (df["Program"] == program)
+    mask &= (df[list(areas)] == 1).any(axis=1)
+    return df[mask.fillna(False).to_numpy(dtype=bool)]
+
+
+def values(df, score, price, price_weight):
+    """Value each section by its evaluation score net of its bid cost
+
+    Missing scores and prices count as zero.
+
+    Args:
+        df (DataFrame): The candidate sections
+        score (str): The name of the evaluation score column
+        price (str): The name of the bid price column
+        price_weight (float): The score given up per bid point
+
+    Returns:
+        ndarray: The value of each section
+    """
+
+    scores = df[score].to_numpy(dtype=float, na_value=np.nan)
+    prices = df[price].to_numpy(dtype=float, na_value=np.nan)
+    return np.nan_to_num(scores) - price_weight * np.nan_to_num(prices)
+
+
+def search(value, conflict, covers, max_courses, top, cover_mask):
+    """Find the best conflict-free bundles by branch and bound
+
+    Sections are visited in decreasing value, so the best completion of a
+    partial bundle is bounded by the sum of the next positive values.
+
+    Args:
+        value (ndarray): The value of each section in decreasing order
+        conflict (list): The conflict bitset of each section
+        covers (list): The bitset of target areas each section satisfies
+        max_courses (int): The largest number of sections in a bundle
+        top (int): The number of bundles to keep
+        cover_mask (int): The areas every bundle must satisfy
+
+    Returns:
+        list: Tuples of the bundle value and the section positions, best
+            first
+    """
+
+    n = len(value)
+    positive = np.maximum(value, 0)
+    prefix = np.concatenate([[0.0], np.cumsum(positive)])
+    best = []
+
+    def visit(start, chosen, blocked, total, covered):
+        # Keep the bundle when it satisfies the required areas
+        if chosen and covered & cover_mask == cover_mask:
+            entry = (total, [-i for i in chosen])
+            if len(best) < top:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        if len(chosen) == max_courses:
+            return
+
+        for i in range(start, n):
+            # Prune when even the best remaining sections cannot improve
+            remaining = max_courses - len(chosen)
+            bound = total + prefix[min(i + remaining, n)] - prefix[i]
+            if len(best) == top and bound <= best[0][0]:
+                return
+            if blocked >> i & 1:
+                continue
+            chosen.append(i)
+            visit(
+                i + 1,
+                chosen,
+                blocked | conflict[i],
+                total + value[i],
+                covered | covers[i],
+            )
+            chosen.pop()
+
+    visit(0, [], 0, 0.0, 0)
+    best.sort(reverse=True)
+    return [(total, [-i for i in chosen]) for total, chosen in best]
+
+
+def solve(
+    df,
+    quarter,
+    program,
+    areas,
+    max_courses=4,
+    top=10,
+    score="Recommend Course",
+    price="Price for P1",
+    price_weight=0.001,
+    cover=False,
+):
+    """Find the best bundles of sections that fit in a week
+
+    Args:
+        df (DataFrame): The course overview
+        quarter (str): The quarter
+        program (str): The program
+        areas (list): The target requirement areas
+        max_courses (int, optional): The largest number of sections in a
+            bundle. Defaults to 4.
+        top (int, optional): The number of bundles to return. Defaults to
+            10.
+        score (str, optional): The evaluation score to maximize. Defaults
+            to "Recommend Course".
+        price (str, optional): The bid price to minimize. Defaults to
+            "Price for P1".
+        price_weight (float, optional): The score given up per bid point.
+            Defaults to 0.001.
+        cover (bool, optional): Whether every bundle must satisfy all the
+            target areas. Defaults to False.
+
+    Returns:
+        DataFrame: The sections of each bundle, numbered from the best
+    """
+
+    sections = candidates(df, quarter, program, areas)
+
+    # Visit the sections in decreasing value
+    value = values(sections, score, price, price_weight)
+    order = np.argsort(-value, kind="stable")
+    sections = sections.iloc[order]
+    value = value[order]
+
+    satisfies = (sections[list(areas)] == 1).fillna(False).to_numpy(bool)
+    found = search(
+        value,
+        conflicts(sections),
+        bitsets(satisfies),
+        max_courses,
+        top,
+        (1 << len(areas)) - 1 if cover else 0,
+    )
+
+    # Stack the sections of each bundle
+    frames = []
+    for number, (total, positions) in enumerate(found, 1):
+        frame = sections.iloc[positions].copy()
+        frame.insert(0, "Bundle", number)
+        frame.insert(1, "Bundle Value", total)
+        frames.append(frame)
+    if not frames:
+        columns = ["Bundle", "Bundle Value", *sections.columns]
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
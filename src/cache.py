@@ -0,0 +1,234 @@
+import glob
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import tempfile
+from . import helper
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cached file regardless of the code hashes
+VERSION = 1
+
+# Store the directory of the package whose code every cached result
+# depends on
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+# Store the cache settings shared by all readers
+settings = {
+    "enabled": True,
+    "rebuild": False,
+    "directory": "cache",
+    "max_bytes": 1024**3,
+}
+
+
+def configure(**kwargs):
+    """Update the cache settings
+
+    Args:
+        **kwargs: Any of the keys in ``settings``
+    """
+
+    unknown = set(kwargs) - set(settings)
+    if unknown:
+        raise KeyError(f"Unknown cache settings: {sorted(unknown)}")
+    settings.update(kwargs)
+
+
+def fingerprint(fname):
+    """Fingerprint a source file
+
+    Args:
+        fname (str): The name of the file
+
+    Returns:
+        dict: The path, size, modification time and content hash
+    """
+
+    stat = os.stat(fname)
+    sha = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return {
+        "path": os.path.abspath(fname),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": sha.hexdigest(),
+    }
+
+
+def code_version(func):
+    """Hash the code that produces a cached result
+
+    Every module of the package, the module defining func when it is
+    outside the package and the table of instructor aliases are included,
+    so that a change to any code a step calls invalidates the cache.
+
+    Args:
+        func (function): The function producing the result
+
+    Returns:
+        str: The hash of the source code
+    """
+
+    sha = hashlib.sha256(str(VERSION).encode())
+    fnames = sorted(glob.glob(os.path.join(PACKAGE, "*.py")))
+    source = os.path.abspath(inspect.getsourcefile(func))
+    if os.path.dirname(source) != PACKAGE:
+        fnames.append(source)
+    for fname in fnames:
+        sha.update(os.path.basename(fname).encode())
+        with open(fname, "rb") as f:
+            sha.update(f.read())
+    if os.path.exists(helper.ALIASES):
+        with open(helper.ALIASES, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def key(func, *parts):
+    """Create a cache key
+
+    Args:
+        func (function): The function producing the result
+        *parts: Any other values identifying the result
+
+    Returns:
+        str: The cache key
+    """
+
+    sha = hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode())
+    sha.update(code_version(func).encode())
+    for part in parts:
+        sha.update(repr(part).encode())
+    return sha.hexdigest()
+
+
+def get(digest):
+    """Get a result from the cache
+
+    Args:
+        digest (str): The cache key of the result
+
+    Returns:
+        object: The cached result, or None if it is not available
+    """
+
+    if not settings["enabled"] or settings["rebuild"]:
+        return None
+
+    # Refresh the access time of the file on a hit
+    path = os.path.join(settings["directory"], f"{digest}.pkl")
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        os.utime(path)
+        return result
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def put(digest, result):
+    """Put a result into the cache
+
+    Args:
+        digest (str): The cache key of the result
+        result (object): The result to store
+    """
+
+    if settings["enabled"]:
+        path = os.path.join(settings["directory"], f"{digest}.pkl")
+        store(path, result)
+        evict()
+
+
+def memoize(digest, func, *args):
+    """Return a cached result or compute and store it
+
+    Args:
+        digest (str): The cache key of the result
+        func (function): The function producing the result
+        *args: The arguments to func
+
+    Returns:
+        object: The result of func(*args)
+    """
+
+    result = get(digest)
+    if result is not None:
+        logger.info(f"Loaded {func.__module__}.{func.__qualname__} from cache")
+        return result
+
+    result = func(*args)
+    put(digest, result)
+    return result
+
+
+def load(func, fname, *args):
+    """Read a source file through the cache
+
+    Args:
+        func (function): The reader called as func(fname, *args)
+        fname (str): The name of the source file
+        *args: Any other arguments to the reader
+
+    Returns:
+        object: The result of the reader
+    """
+
+    digest = key(func, fingerprint(fname), *args)
+    return memoize(digest, func, fname, *args)
+
+
+def store(path, result):
+    """Atomically write a result to the cache
+
+    Args:
+        path (str): The name of the cache file
+        result (object): The result to store
+    """
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def evict():
+    """Remove the least recently used files above the size limit"""
+
+    directory = settings["directory"]
+    if not os.path.isdir(directory):
+        return
+
+    # Find the cached files from most to least recently used, skipping
+    # those another process removed in the meantime
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(".pkl"):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    entries.sort(reverse=True)
+
+    # Keep files until the size limit is reached
+    total = 0
+    for _, size, name in entries:
+        total += size
+        if total > settings["max_bytes"]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
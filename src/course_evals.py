@@ -1,60 +1,49 @@
+import glob
+import importlib.util
+import logging
 import os
+import re
+import numpy as np
 import pandas as pd
-from . import helper
+from . import cache, helper, instrument, parallel
 
+logger = logging.getLogger(__name__)
 
-def rename_last(names):
-    """Renames last names that do not match
+# Store the number of rows of the BLUE export read at a time
+CHUNKSIZE = 50000
 
-    Args:
-        names (series): The professor names
-
-    Returns:
-        series: The cleaned professor names
-    """
-
-    # Store names not matching
-    change_dict = {
-        "Pagliari Jr.": "Pagliari",
-        "Mcgowan": "McGowan",
-        "Dube": "Dubé",
-        "O'brien": "O'Brien",
-    }
+# Match BUSN course titles such as "BUSN 30000 01"
+COURSE_TITLE = re.compile(r"^BUSN (?P<Course>\d+) (?P<Section>\d+)$")
 
-    # Replace names
-    for k, v in change_dict.items():
-        names = names.str.replace(k, v, regex=True)
+# Match quarters such as "Winter 2021"
+QUARTER = re.compile(r"^(?P<Quarter>\S+) (?P<Year>\d+)$")
 
-    return names
+# Store the variables identifying an evaluation across files
+KEYS = ["Course", "Year", "Quarter", "Section", "Instructor ID"]
 
 
-def read_historical():
+@instrument.timed
+def read_historical(fname):
     """Read the historical course evaluations
 
+    Args:
+        fname (str): The name of the file
+
     Returns:
         DataFrame: The cleaned historical course evaluations
     """
 
     # Read the historical evaluations
-    fname = os.path.join("data", "course_evals.xlsx")
-    print(f"Reading Historical Course Evaluations from {fname}")
+    logger.info(f"Reading Historical Course Evaluations from {fname}")
     df = pd.read_excel(fname)
 
     # Store program instead of section
-    df["Program"] = df["SECT"].map(helper.section_to_program)
+    df["Program"] = helper.programs(df["SECT"])
 
     # Expand the name of the quarter
-    df["Quarter"] = df["QTR"].map(helper.qtr_to_quarter)
-    # Clean up the instructor's name
-    # TODO: Do this in a cleaner regex statement
-    df["Instructor"] = df["Instructor"].str.replace(
-        r"(\S+, \S+) (\(.*\))", r"\1", regex=True
-    )
-    df[["Last Name", "First Name"]] = df["Instructor"].str.split(
-        ", ", expand=True
-    )
-    # Clean up last names
-    df["Last Name"] = rename_last(df["Last Name"])
+    df["Quarter"] = helper.quarters(df["QTR"])
+    # Split the instructor names
+    df = df.join(helper.names(df["Instructor"]))
 
     # Rename columns
     rename_dict = {
@@ -77,6 +66,9 @@ def read_historical():
     # Remove unwanted columns
     df = df.drop(columns=["QTR", "Instructor"])
 
+    # Encode the shared columns
+    df = helper.encode(df)
+
     # Order the columns
     column_ordering = helper.column_ordering(df.columns)
     df = df[column_ordering]
@@ -88,33 +80,46 @@ def read_historical():
     return df
 
 
+@instrument.timed
 def read_new(fname):
     """Read the course evaluations from BLUE
 
+    The export is read in chunks, so memory grows with the BUSN courses kept
+    rather than with the size of the file.
+
+    Args:
+        fname (str): The name of the file
+
     Returns:
         DataFrame: The cleaned BLUE evaluations
     """
 
-    # Read the file
-    print(f"Reading New Course Evaluations from {fname}")
-    df = pd.read_csv(fname)
-
-    # Get the course number
-    df[["Department", "Course", "Section"]] = df["Course Title"].str.split(
-        " ", expand=True
-    )
-    df = df[df["Department"] == "BUSN"]
-    df["Course"] = df["Course"].astype(int)
-    df["Section"] = df["Section"].astype(int)
-    df["Program"] = df["Section"].map(helper.section_to_program)
-
-    # Get the year and quarter
-    df[["Quarter", "Year"]] = df["Quarter"].str.split(" ", expand=True)
-    df["Year"] = df["Year"].astype(int)
-    df["Quarter"] = df["Quarter"].map(helper.qtr_to_quarter)
+    # Read the parsed columns as arrow strings when pyarrow is installed
+    logger.info(f"Reading New Course Evaluations from {fname}")
+    string = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else str
+    dtype = {"Course Title": string, "Quarter": string}
+
+    # Parse a chunk of the file at a time, keeping only the BUSN courses
+    chunks = []
+    for chunk in pd.read_csv(fname, dtype=dtype, chunksize=CHUNKSIZE):
+        chunk = chunk[chunk["Course Title"].str.startswith("BUSN ", na=False)]
+
+        # Get the course number
+        titles = chunk.pop("Course Title").str.extract(COURSE_TITLE)
+        chunk["Course"] = titles["Course"].astype(int)
+        chunk["Section"] = titles["Section"].astype(int)
+        chunk["Program"] = helper.programs(chunk["Section"])
+
+        # Get the year and quarter
+        quarters = chunk["Quarter"].str.extract(QUARTER)
+        chunk["Year"] = quarters["Year"].astype(int)
+        chunk["Quarter"] = helper.quarters(quarters["Quarter"].astype(object))
+        chunks.append(chunk)
+    df = pd.concat(chunks)
 
     # Clean up last names
-    df["Last Name"] = rename_last(df["Last Name"])
+    df["Last Name"] = helper.last_names(df["Last Name"])
+    df["Instructor ID"] = helper.instructor_ids(df["Last Name"])
 
     # Order and rename the columns
     rename_dict = {
@@ -155,8 +160,8 @@ def read_new(fname):
         1
     )
 
-    # Remove unwanted columns
-    df = df.drop(columns=["Course Title", "Department"])
+    # Encode the shared columns
+    df = helper.encode(df)
 
     # Order the columns
     column_ordering = helper.column_ordering(df.columns)
@@ -168,21 +173,89 @@ def read_new(fname):
     return df
 
 
-def main():
-    """Read and merge the course evaluations
+# Store the file patterns of each reader under the data directory
+PATTERNS = [
+    # The historical files from 2015-2019
+    (read_historical, "course_evals*.xlsx"),
+    # The new files from BLUE, one or more per term and program
+    (read_new, "ExportReport_*.csv"),
+]
+
+
+def sources(directory="data"):
+    """List the course evaluation files and their readers
+
+    Files are listed in the order of PATTERNS and then by name, which is the
+    order in which later files replace the rows of earlier ones.
+
+    Args:
+        directory (str, optional): The directory of the data files.
+            Defaults to "data".
 
     Returns:
-        DataFrame: The cleaned course evaluations
+        list: Tuples of the reader and the name of the file
     """
 
-    # Read the historical files from 2015-2019
-    df_historical = read_historical()
+    found = []
+    for reader, pattern in PATTERNS:
+        fnames = sorted(glob.glob(os.path.join(directory, pattern)))
+        found += [(reader, fname) for fname in fnames]
+    if not found:
+        patterns = [pattern for _, pattern in PATTERNS]
+        raise FileNotFoundError(
+            f"No course evaluations matching {patterns} in {directory}"
+        )
+    return found
+
+
+def combine(frames):
+    """Append the course evaluations, drop duplicates and re-sort
+
+    An evaluation found in several files is kept from the last of them, so
+    the result does not depend on the order in which the files were read.
+    Evaluations repeated within one file are all kept, as the summaries
+    take their median.
 
-    # Read the new files from BLUE
-    df_new_mba = read_new(os.path.join("data", "ExportReport_MBA.csv"))
+    Args:
+        frames (list): The cleaned course evaluations of each file, in the
+            order of sources()
+
+    Returns:
+        DataFrame: The combined course evaluations
+    """
+
+    df = pd.concat(frames, ignore_index=True)
+    df = helper.encode(df)
+
+    # Keep the evaluations of the latest file listing each key
+    keys = df[KEYS].copy()
+    keys["File"] = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    latest = keys.groupby(KEYS, observed=True)["File"].transform("max")
+    replaced = (latest > keys["File"]).to_numpy()
+    if replaced.any():
+        logger.info(
+            f"Dropped {replaced.sum()} course evaluations replaced by a "
+            "later file"
+        )
+        df = df[~replaced]
 
-    # Append the two and re-sort
-    df = pd.concat([df_historical, df_new_mba])
     column_sorting = helper.column_sorting(df.columns)
-    df = df.sort_values(column_sorting)
+    df = df.sort_values(column_sorting, kind="mergesort")
     return df
+
+
+def main(workers=1):
+    """Read and merge the course evaluations
+
+    Each file is cached on its own, so adding an export only reads that one.
+
+    Args:
+        workers (int, optional): The number of worker processes reading the
+            files in parallel. Defaults to 1.
+
+    Returns:
+        DataFrame: The cleaned course evaluations
+    """
+
+    tasks = [(cache.load, reader, fname) for reader, fname in sources()]
+    return combine(parallel.run(tasks, workers))
@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import re
+import numpy as np
+import pandas as pd
+from . import helper, instrument
+
+logger = logging.getLogger(__name__)
+
+# Store the groups with their own price model
+GROUP_VARS = ["Course", "Program", "Instructor ID"]
+
+# Store the prior weight, in squared terms, shrinking each trend to flat
+SHRINKAGE = 4.0
+
+# Match the price column of each bidding phase
+PRICE = re.compile(r"^Price for (.+)$")
+
+
+def phases(columns):
+    """Find the bidding phases with a price column
+
+    Args:
+        columns (list): The columns of the price history
+
+    Returns:
+        list: The name of each phase, such as "P1" or "P1 NS"
+    """
+
+    return [m.group(1) for m in map(PRICE.match, columns) if m is not None]
+
+
+class Forecaster:
+    """A price trend and sell-out rate for every course and instructor
+
+    The price history is kept as sufficient statistics for each group and
+    term, so the model is refit from sums over terms rather than rows. A
+    new or changed term only has its own statistics computed again.
+
+    Args:
+        group_vars (list, optional): The names of the variables to model
+            separately. Defaults to GROUP_VARS.
+    """
+
+    def __init__(self, group_vars=GROUP_VARS):
+        self.group_vars = list(group_vars)
+        self.phases = []
+        self.digests = {}
+        self.stats = None
+
+    def terms(self, df):
+        """Fingerprint the rows of each term of the price history
+
+        Args:
+            df (DataFrame): The price history
+
+        Returns:
+            dict: The term key and digest of the rows of each term
+        """
+
+        keys = helper.term(df["Year"], df["Quarter"])
+        rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+        # Sort the row hashes within each term so row order does not matter
+        order = np.lexsort((rows, keys))
+        terms, starts = np.unique(keys[order], return_index=True)
+        digests = {}
+        for t, chunk in zip(terms, np.split(rows[order], starts[1:])):
+            digests[int(t)] = hashlib.sha256(chunk.tobytes()).hexdigest()
+        return digests
+
+    def accumulate(self, df):
+        """Compute the sufficient statistics of each group and term
+
+        Args:
+            df (DataFrame): The price history
+
+        Returns:
+            DataFrame: The counts and sums of each group and term
+        """
+
+        frame = df[self.group_vars].reset_index(drop=True)
+        frame["Term"] = helper.term(df["Year"], df["Quarter"])
+        for phase in self.phases:
+            price = df[f"Price for {phase}"].to_numpy(float, na_value=np.nan)
+            frame[f"n {phase}"] = ~np.isnan(price)
+            frame[f"y {phase}"] = np.nan_to_num(price)
+
+            # Count the sections without seats left after the phase
+            available = f"Available after {phase}"
+            if available in df.columns:
+                seats = df[available].to_numpy(float, na_value=np.nan)
+                frame[f"m {phase}"] = ~np.isnan(seats)
+                frame[f"k {phase}"] = seats == 0
+
+        keys = [*self.group_vars, "Term"]
+        return frame.groupby(keys, as_index=False, observed=True).sum()
+
+    @instrument.timed
+    def update(self, df):
+        """Refit the model with the terms that were added or changed
+
+        Args:
+            df (DataFrame): The whole price history
+
+        Returns:
+            Forecaster: The updated model
+        """
+
+        found = phases(df.columns)
+        digests = self.terms(df)
+        if found != self.phases or self.stats is None:
+            self.phases = found
+            self.digests = {}
+            self.stats = self.accumulate(df.iloc[:0])
+
+        # Drop the terms that changed or disappeared
+        stale = [t for t, d in self.digests.items() if digests.get(t) != d]
+        fresh = [t for t, d in digests.items() if self.digests.get(t) != d]
+        kept = ~self.stats["Term"].isin(stale)
+
+        # Accumulate the new terms and combine them with the kept ones
+        rows = np.isin(helper.term(df["Year"], df["Quarter"]), fresh)
+        added = self.accumulate(df[rows])
+        helper.share_categories([self.stats, added], self.group_vars)
+        self.stats = pd.concat([self.stats[kept], added], ignore_index=True)
+        self.digests = digests
+        logger.info(
+            f"Refit price forecasts for {len(fresh)} of {len(digests)} terms"
+        )
+        return self
+
+    @instrument.timed
+    def predict(self, df):
+        """Forecast the clearing price and sell-out chance of each course
+
+        Each price follows a least-squares trend over terms, shrunk toward
+        the group mean when there are few terms, and is evaluated at the
+        term of each course. Sell-out chances are smoothed by one sold out
+        and one not sold out section.
+
+        Args:
+            df (DataFrame): The course overview with Year and Quarter
+
+        Returns:
+            DataFrame: The forecasts of each phase, aligned with df
+        """
+
+        # Sum the statistics of each group over all terms
+        stats = self.stats.copy()
+        t = stats["Term"].to_numpy(float)
+        columns = []
+        for phase in self.phases:
+            n = stats[f"n {phase}"].to_numpy(float)
+            y = stats[f"y {phase}"].to_numpy(float)
+            stats[f"t {phase}"] = n * t
+            stats[f"tt {phase}"] = n * t * t
+            stats[f"ty {phase}"] = t * y
+            columns += [f"{s} {phase}" for s in ["n", "y", "t", "tt", "ty"]]
+            if f"m {phase}" in stats.columns:
+                columns += [f"m {phase}", f"k {phase}"]
+        sums = stats.groupby(self.group_vars, as_index=False, observed=True)[
+            columns
+        ].sum()
+
+        # Look up the sums of the group of each course
+        keys = df[self.group_vars].reset_index(drop=True)
+        helper.share_categories([keys, sums], self.group_vars)
+        sums = keys.merge(sums, on=self.group_vars, how="left")
+        target = helper.term(df["Year"], df["Quarter"]).astype(float)
+
+        forecasts = pd.DataFrame(index=df.index)
+        for phase in self.phases:
+            n, y, t, tt, ty = (
+                sums[f"{s} {phase}"].to_numpy(float)
+                for s in ["n", "y", "t", "tt", "ty"]
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_bar = t / n
+                y_bar = y / n
+                slope = (ty - t_bar * y) / (tt - t_bar * t + SHRINKAGE)
+                price = y_bar + slope * (target - t_bar)
+            forecasts[f"Forecast Price for {phase}"] = np.maximum(price, 0)
+
+            if f"m {phase}" in sums.columns:
+                m = sums[f"m {phase}"].to_numpy(float)
+                k = sums[f"k {phase}"].to_numpy(float)
+                chance = np.where(m > 0, (k + 1) / (m + 2), np.nan)
+                forecasts[f"Sell Out Chance for {phase}"] = chance
+        return forecasts
+
+
+def fit(df, model=None):
+    """Fit the price forecasts, reusing the terms of an earlier model
+
+    Args:
+        df (DataFrame): The price history
+        model (Forecaster, optional): The model of the last run. Defaults
+            to None, which fits every term.
+
+    Returns:
+        Forecaster: The fitted model
+    """
+
+    if model is None:
+        model = Forecaster()
+    return model.update(df)
+
+
+def main(df, model):
+    """Forecast the prices of the courses in the overview
+
+    Args:
+        df (DataFrame): The course overview
+        model (Forecaster): The fitted model
+
+    Returns:
+        DataFrame: The forecasts, aligned with df
+    """
+
+    return model.predict(df)
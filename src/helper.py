@@ -1,6 +1,115 @@
-import copy
-from operator import itemgetter
+import functools
+import logging
+import os
+import re
+import unicodedata
+import zlib
+import numpy as np
 import pandas as pd
+from pandas.api.types import CategoricalDtype
+from . import instrument
+
+logger = logging.getLogger(__name__)
+
+# Store the categories shared by all files
+QUARTERS = ["Autumn", "Winter", "Spring", "Summer"]
+PROGRAMS = ["EMBA", "Evening", "Full-Time", "NA", "PhD", "Weekend"]
+MODALITIES = ["IP", "R", "D", "D-FIP", "D-FR", ""]
+SESSIONS = ["Full", "First Half", "Second Half"]
+
+# Store the compact types of the columns shared by all files
+# Quarter is ordered so that sorting follows the academic year
+schema = {
+    "Quarter": CategoricalDtype(QUARTERS, ordered=True),
+    "Program": CategoricalDtype(PROGRAMS),
+    "Modality": CategoricalDtype(MODALITIES),
+    "Session": CategoricalDtype(SESSIONS),
+}
+
+# Store the columns whose categories depend on the data, including the text
+# repeated across the sections and terms of a course
+categorical = [
+    "Day",
+    "Last Name",
+    "First Name",
+    "Title",
+    "Time",
+    "Note",
+    "Prerequisites",
+    "Room",
+    "Course Syllabus",
+    "Syllabus",
+]
+
+
+# Store the program of each section number from 0 to 99
+SECTION_PROGRAMS = np.full(100, PROGRAMS.index("NA"), dtype=np.int8)
+SECTION_PROGRAMS[1:10] = PROGRAMS.index("Full-Time")
+SECTION_PROGRAMS[81:85] = PROGRAMS.index("Evening")
+SECTION_PROGRAMS[85:87] = PROGRAMS.index("Weekend")
+SECTION_PROGRAMS[87:94] = PROGRAMS.index("EMBA")
+SECTION_PROGRAMS[[50, 60]] = PROGRAMS.index("PhD")
+
+# Store the quarter of each spelling used across the files
+QTR_QUARTERS = {
+    1: "Autumn",
+    "AUT": "Autumn",
+    "Autumn": "Autumn",
+    2: "Winter",
+    "WIN": "Winter",
+    "Winter": "Winter",
+    3: "Spring",
+    "SPR": "Spring",
+    "Spring": "Spring",
+    0: "Summer",
+    "SUM": "Summer",
+    "Summer": "Summer",
+}
+QTR_CODES = np.array([QUARTERS.index(q) for q in QTR_QUARTERS.values()])
+
+# Store the name of the table of last names spelled differently across files
+ALIASES = os.path.join("data", "instructor_aliases.txt")
+
+# Match instructors such as "Last, First (Nickname); Last, First", keeping
+# the first instructor without the nickname
+INSTRUCTOR = re.compile(
+    r"^\s*(?P<Last>[^,;(]*?)\s*(?:,\s*(?P<First>[^;(]*?))?\s*"
+    r"(?:\(.*?\))?\s*(?:;.*)?$"
+)
+
+# Store the modality of each note in the booth schedule
+NOTE_MODALITIES = {
+    "In-Person Only": "IP",
+    "Remote-Only": "R",
+    "Dual Modality": "D",
+    "Faculty In-Person, Dual Modality": "D-FIP",
+    "Faculty Remote, Dual Modality": "D-FR",
+}
+NOTE_CODES = np.array([MODALITIES.index(m) for m in NOTE_MODALITIES.values()])
+
+# Match the half-quarter sessions, such as "First half" or "(2nd Half)"
+HALF = re.compile(r"\b(first|1st|second|2nd)\s+half\b", re.IGNORECASE)
+HALF_SESSIONS = {"first": 1, "1st": 1, "second": 2, "2nd": 2}
+
+
+def programs(sections):
+    """Transform section numbers into programs
+
+    Args:
+        sections (array-like): The numbers of the sections
+
+    Returns:
+        Categorical: The names of the programs
+    """
+
+    values = pd.Series(sections).to_numpy(dtype=float, na_value=np.nan)
+    codes = np.full(len(values), PROGRAMS.index("NA"), dtype=np.int8)
+
+    # Only whole section numbers within the table have a program
+    with np.errstate(invalid="ignore"):
+        valid = (values >= 0) & (values < 100) & (values % 1 == 0)
+    codes[valid] = SECTION_PROGRAMS[values[valid].astype(int)]
+    return pd.Categorical.from_codes(codes, dtype=schema["Program"])
 
 
 def section_to_program(section):
@@ -13,18 +122,30 @@ def section_to_program(section):
         str: The name of the program
     """
 
-    if section in range(1, 10):
-        return "Full-Time"
-    elif section in range(81, 85):
-        return "Evening"
-    elif section in range(85, 87):
-        return "Weekend"
-    elif section in range(87, 94):
-        return "EMBA"
-    elif section == 50 or section == 60:
-        return "PhD"
-    else:
-        return "NA"
+    try:
+        if section == int(section) and 0 <= section < len(SECTION_PROGRAMS):
+            return PROGRAMS[SECTION_PROGRAMS[int(section)]]
+    except (TypeError, ValueError):
+        pass
+    return "NA"
+
+
+def quarters(qtrs):
+    """Transform quarters into the standard form
+
+    Args:
+        qtrs (array-like): The initial quarters
+
+    Returns:
+        Categorical: The standardized quarters
+    """
+
+    positions = pd.Index(list(QTR_QUARTERS)).get_indexer(qtrs)
+    if (positions < 0).any():
+        unknown = pd.unique(np.asarray(qtrs, dtype=object)[positions < 0])
+        raise KeyError(f"Unknown quarters: {list(unknown)}")
+    codes = QTR_CODES[positions]
+    return pd.Categorical.from_codes(codes, dtype=schema["Quarter"])
 
 
 def qtr_to_quarter(qtr):
@@ -37,21 +158,7 @@ def qtr_to_quarter(qtr):
         str: The standardized quarter
     """
 
-    qtr_dict = {
-        1: (1, "Autumn"),
-        "AUT": (1, "Autumn"),
-        "Autumn": (1, "Autumn"),
-        2: (2, "Winter"),
-        "WIN": (2, "Winter"),
-        "Winter": (2, "Winter"),
-        3: (3, "Spring"),
-        "SPR": (3, "Spring"),
-        "Spring": (3, "Spring"),
-        0: (4, "Summer"),
-        "SUM": (4, "Summer"),
-        "Summer": (4, "Summer"),
-    }
-    return qtr_dict[qtr]
+    return QTR_QUARTERS[qtr]
 
 
 def yq_to_year_quarter(yq):
@@ -61,7 +168,7 @@ def yq_to_year_quarter(yq):
         yq (int): Year + QuarterNum/4
 
     Returns:
-        tuple: year, quarter
+        tuple: year, quarter name
     """
 
     year = int(yq // 1)
@@ -69,6 +176,206 @@ def yq_to_year_quarter(yq):
     return (year, quarter)
 
 
+def aliases(fname=ALIASES):
+    """Read the table of last names spelled differently across files
+
+    Each line contains Canonical: Alias, Alias. A missing file has no
+    aliases. The file is only read again when it changes.
+
+    Args:
+        fname (str, optional): The name of the file. Defaults to ALIASES.
+
+    Returns:
+        dict: The canonical last name of each alias
+    """
+
+    if not os.path.exists(fname):
+        return {}
+    stat = os.stat(fname)
+    return dict(read_aliases(fname, stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=None)
+def read_aliases(fname, mtime, size):
+    """Read the table of aliases once for each version of the file
+
+    Args:
+        fname (str): The name of the file
+        mtime (int): The modification time of the file in nanoseconds
+        size (int): The size of the file in bytes
+
+    Returns:
+        dict: The canonical last name of each alias
+    """
+
+    table = {}
+    with open(fname, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            canonical, spellings = line.split(":", 1)
+            for alias in spellings.split(","):
+                table[alias.strip()] = canonical.strip()
+    return table
+
+
+def last_names(names):
+    """Replace the aliases of last names by their canonical spelling
+
+    Args:
+        names (array-like): The last names
+
+    Returns:
+        Series: The canonical last names
+    """
+
+    # Look up each distinct name once
+    names = pd.Series(names, dtype=object)
+    codes, uniques = pd.factorize(names)
+    canonical = pd.Series(uniques, dtype=object).replace(aliases())
+    return pd.Series(take(canonical.to_numpy(), codes), index=names.index)
+
+
+def fold(name):
+    """Fold a last name so that case and accents are ignored
+
+    Args:
+        name (str): The canonical last name
+
+    Returns:
+        str: The folded name, so "Dube" and "Dubé" are both "dube"
+    """
+
+    folded = unicodedata.normalize("NFKD", name.strip().casefold())
+    return "".join(c for c in folded if not unicodedata.combining(c))
+
+
+def instructor_id(name):
+    """Hash a last name into an instructor ID
+
+    Case and accents are ignored, so "Dube" and "Dubé" share an ID.
+
+    Args:
+        name (str): The canonical last name
+
+    Returns:
+        int: The unsigned 32-bit ID, or 0 for a missing name
+    """
+
+    if not isinstance(name, str):
+        return 0
+    return zlib.crc32(fold(name).encode())
+
+
+def instructor_ids(names):
+    """Hash last names into instructor IDs
+
+    Distinct names sharing an ID would be merged by every join on the
+    instructor, so such collisions are reported.
+
+    Args:
+        names (array-like): The canonical last names
+
+    Returns:
+        ndarray: The unsigned 32-bit ID of each name, 0 for missing ones
+    """
+
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+    ids = np.array([instructor_id(n) for n in uniques], dtype=np.uint32)
+
+    # Check that distinct folded names have distinct IDs
+    folded = pd.Series([fold(n) for n in uniques], dtype=object)
+    owners = folded.groupby(ids).unique()
+    for i, spellings in owners[owners.str.len() > 1].items():
+        logger.warning(
+            f"Instructors {', '.join(spellings)} share the ID {i} and will "
+            "be merged"
+        )
+    return np.append(ids, np.uint32(0))[codes]
+
+
+def names(instructors):
+    """Split instructors into canonical names and an instructor ID
+
+    Each distinct instructor is parsed once with INSTRUCTOR, so a later
+    instructor or a nickname is dropped, and the last name is replaced by
+    its canonical spelling.
+
+    Args:
+        instructors (array-like): The instructors as "Last, First"
+
+    Returns:
+        DataFrame: The Last Name, First Name and Instructor ID
+    """
+
+    instructors = pd.Series(instructors, dtype=object)
+    codes, uniques = pd.factorize(instructors)
+    parsed = pd.Series(uniques, dtype=object).str.extract(INSTRUCTOR)
+    last = last_names(parsed["Last"]).to_numpy()
+    first = parsed["First"].to_numpy(dtype=object)
+    ids = instructor_ids(last)
+    return pd.DataFrame(
+        {
+            "Last Name": take(last, codes),
+            "First Name": take(first, codes),
+            "Instructor ID": np.append(ids, np.uint32(0))[codes],
+        },
+        index=instructors.index,
+    ).astype({"Instructor ID": np.uint32})
+
+
+def take(values, codes):
+    """Expand the values of distinct elements back to every element
+
+    Args:
+        values (ndarray): The value of each distinct element
+        codes (ndarray): The position of each element in values, or -1 for
+            a missing element
+
+    Returns:
+        ndarray: The value of each element, with NaN for missing ones
+    """
+
+    # Append NaN as the value of code -1, which also covers empty values
+    return np.append(np.asarray(values, dtype=object), np.nan)[codes]
+
+
+def modalities(notes):
+    """Extract modalities from notes in booth schedule
+
+    Args:
+        notes (array-like): The note descriptions
+
+    Returns:
+        Categorical: The modalities of the courses
+    """
+
+    positions = pd.Index(list(NOTE_MODALITIES)).get_indexer(notes)
+    codes = np.where(
+        positions < 0, MODALITIES.index(""), NOTE_CODES[positions]
+    )
+    return pd.Categorical.from_codes(codes, dtype=schema["Modality"])
+
+
+def sessions(*texts):
+    """Detect the half-quarter session of each section in booth schedule
+
+    Args:
+        *texts (array-like): The texts naming the session, such as the notes
+            and the meeting times
+
+    Returns:
+        Categorical: The sessions, Full unless a text names a half
+    """
+
+    codes = np.zeros(len(texts[0]), dtype=np.int8)
+    for text in texts:
+        found = pd.Series(text, dtype="string").str.extract(HALF)[0]
+        half = found.str.lower().map(HALF_SESSIONS)
+        codes = np.where(half.notna(), half.fillna(0), codes).astype(np.int8)
+    return pd.Categorical.from_codes(codes, dtype=schema["Session"])
+
+
 def modality(note):
     """Extract modality from note in booth schedule
 
@@ -79,22 +386,75 @@ def modality(note):
         str: The modality of the course
     """
 
-    modality_dict = {
-        "In-Person Only": "IP",
-        "Remote-Only": "R",
-        "Dual Modality": "D",
-        "Faculty In-Person, Dual Modality": "D-FIP",
-        "Faculty Remote, Dual Modality": "D-FR",
-    }
-    if note in modality_dict:
-        return modality_dict[note]
-    else:
-        return ""
+    return NOTE_MODALITIES.get(note, "")
+
+
+def term(year, quarter):
+    """Pack a year and quarter into an integer key ordered in time
+
+    Args:
+        year (Series): The years
+        quarter (Series): The quarters with the Quarter categories
+
+    Returns:
+        ndarray: The key 4 * Year + quarter number - 1
+    """
+
+    codes = quarter.astype(schema["Quarter"]).cat.codes.to_numpy()
+    return 4 * np.asarray(year, dtype=np.int64) + codes
 
 
+def encode(df):
+    """Encode the columns shared by all files with compact types
+
+    Args:
+        df (DataFrame): The df to encode in place
+
+    Returns:
+        DataFrame: The encoded df
+    """
+
+    for column, dtype in schema.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    for column in categorical:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return df
+
+
+def share_categories(frames, columns):
+    """Give categorical columns the same categories across several dfs
+
+    Merges on categorical keys only join on the integer codes when both
+    sides share their categories.
+
+    Args:
+        frames (list): The dfs to update in place
+        columns (list): The names of the categorical columns
+    """
+
+    for column in columns:
+        present = [df for df in frames if column in df.columns]
+        categories = [
+            df[column].astype("category").cat.categories.astype(object)
+            for df in present
+        ]
+        categories = pd.Index(
+            np.concatenate(categories), dtype=object
+        ).unique()
+        for df in present:
+            values = df[column].astype("category")
+            df[column] = values.cat.set_categories(categories)
+
+
+@instrument.timed
 def summarize(df, group_vars):
     """Summarized a df a group of variables
 
+    Only the rows of the last quarter in which each group was offered are
+    kept, and the median of their numeric columns is taken.
+
     Args:
         df (DataFrame): The df to group
         group_vars (list): The names of variables to group by
@@ -103,27 +463,20 @@ def summarize(df, group_vars):
         DataFrame: The grouped dataframe
     """
 
-    # Create a numerical representation of the last time the course was offered
-    df["Q"] = pd.Series(map(itemgetter(0), df["Quarter"])) / 4
-    df["YQ"] = df["Year"] + df["Q"]
-    df = df.drop(columns=["Q"])
-
-    # Create a copy fo the dataframe and subset variables to find maximum of
-    df_last = copy.deepcopy(df)
-    sub_vars = copy.deepcopy(group_vars)
-    sub_vars.extend(["YQ"])
-    df_last = df_last[sub_vars]
-
-    # Find the maximum YQ on which the quarter was offered
-    # This represents the last time that this course was offered
-    df_last = df_last.groupby(group_vars, as_index=False).max()
+    # Create a numerical representation of the time the course was offered
+    keys = df[group_vars].reset_index(drop=True)
+    keys["YQ"] = term(df["Year"], df["Quarter"])
 
-    # Merge df and df_last, keeping only unique observations
-    df_merge = pd.merge(df, df_last, how="inner", on=sub_vars)
+    # Find the last time that each group was offered
+    grouped = keys.groupby(group_vars, observed=True)["YQ"]
+    latest = keys["YQ"] == grouped.transform("max")
 
     # Then for cases that are still not unique, find the median
-    df_merge = df_merge.groupby(group_vars, as_index=False).median()
-    df_merge = df_merge.drop(columns=["YQ"])
+    df_latest = df[latest.to_numpy()]
+    df_merge = df_latest.groupby(
+        group_vars, as_index=False, observed=True
+    ).median(numeric_only=True)
+    df_merge = df_merge.sort_values(group_vars, ignore_index=True)
 
     # Identify columns to drop
     drop_columns = [
@@ -160,8 +513,10 @@ base = [
     "Section",
     "Last Name",
     "First Name",
+    "Instructor ID",
     "Day",
     "Time",
+    "Session",
 ]
 
 
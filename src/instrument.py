@@ -0,0 +1,319 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Store the instrumentation settings shared by all modules
+settings = {"memory": False}
+
+# Store the measurements of the run in the order they finished
+records = []
+
+# Store the open measurements of each thread, outermost first
+local = threading.local()
+
+# Store the start of the run
+START = time.perf_counter()
+
+
+def configure(**kwargs):
+    """Update the instrumentation settings
+
+    Args:
+        **kwargs: Any of the keys in ``settings``
+    """
+
+    unknown = set(kwargs) - set(settings)
+    if unknown:
+        raise KeyError(f"Unknown instrumentation settings: {sorted(unknown)}")
+    settings.update(kwargs)
+    if settings["memory"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def frames(obj):
+    """Find the dfs held by a value
+
+    Args:
+        obj (object): A df, a series, or a list, tuple or dict of them
+
+    Returns:
+        list: The dfs and series
+    """
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return [obj]
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        return [f for o in obj for f in frames(o)]
+    return []
+
+
+def rows(obj):
+    """Count the rows of the dfs held by a value
+
+    Args:
+        obj (object): A df, a series, or a list, tuple or dict of them
+
+    Returns:
+        int: The number of rows, or None if there are no dfs
+    """
+
+    found = frames(obj)
+    return sum(len(f) for f in found) if found else None
+
+
+def describe(record, result):
+    """Add the size of a result to a measurement
+
+    Args:
+        record (dict): The measurement
+        result (object): The result of the measured code
+    """
+
+    record["rows_out"] = rows(result)
+    if settings["memory"]:
+        found = frames(result)
+        if found:
+            nbytes = sum(f.memory_usage(deep=True).sum() for f in found)
+            record["frame_mb"] = int(nbytes) / 1e6
+
+
+@contextlib.contextmanager
+def measure(name, inputs=None):
+    """Measure the time and memory used by a block of code
+
+    Blocks nest, so the name of a measurement includes the names of the
+    blocks it runs in. The peak memory is only traced when the memory
+    setting is on, as tracing slows down the run.
+
+    Args:
+        name (str): The name of the block
+        inputs (object, optional): The inputs of the block, whose rows are
+            counted. Defaults to None.
+
+    Yields:
+        dict: The measurement, which the block may add to
+    """
+
+    stack = local.__dict__.setdefault("stack", [])
+    path = [*(r["name"] for r in stack[-1:]), name]
+    record = {
+        "name": "/".join(path),
+        "start_s": time.perf_counter() - START,
+        "rows_in": rows(inputs),
+    }
+
+    # Hand the peak so far to the parent before tracing this block
+    memory = settings["memory"] and tracemalloc.is_tracing()
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["_peak"] = max(stack[-1]["_peak"], peak)
+        tracemalloc.reset_peak()
+        record.update(_start=current, _peak=current)
+
+    stack.append(record)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = time.process_time() - cpu
+        stack.pop()
+
+        # Report the peak above the memory in use at the start
+        if memory:
+            peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+            record["peak_mb"] = (peak - record.pop("_start")) / 1e6
+            if stack:
+                stack[-1]["_peak"] = max(stack[-1]["_peak"], peak)
+            tracemalloc.reset_peak()
+
+        records.append(record)
+        logger.debug(
+            f"{record['name']} took {record['wall_s']:.3f} s wall and "
+            f"{record['cpu_s']:.3f} s cpu"
+        )
+
+
+def annotate(**values):
+    """Add values to the innermost open measurement
+
+    Args:
+        **values: The values to record
+    """
+
+    stack = local.__dict__.setdefault("stack", [])
+    if stack:
+        stack[-1].update(values)
+
+
+def current():
+    """Name the innermost open measurement of the current thread
+
+    Returns:
+        str: The name of the measurement, or None outside of any
+    """
+
+    stack = local.__dict__.setdefault("stack", [])
+    return stack[-1]["name"] if stack else None
+
+
+def within(parent, func, *args):
+    """Call a function on another thread inside a measurement of its caller
+
+    Each thread keeps its own open measurements, so a function handed to a
+    thread pool would otherwise be measured outside of the block that
+    started it.
+
+    Args:
+        parent (str): The name of the measurement, as in current
+        func (function): The function to call
+        *args: The arguments to func
+
+    Returns:
+        object: The result of func(*args)
+    """
+
+    if parent is None:
+        return func(*args)
+    stack = local.__dict__.setdefault("stack", [])
+    stack.append({"name": parent, "_peak": 0})
+    try:
+        return func(*args)
+    finally:
+        stack.pop()
+
+
+def run(name, func, *args):
+    """Call a function inside a measurement
+
+    Args:
+        name (str): The name of the measurement
+        func (function): The function to call
+        *args: The arguments to func
+
+    Returns:
+        object: The result of func(*args)
+    """
+
+    with measure(name, args) as record:
+        result = func(*args)
+        describe(record, result)
+    return result
+
+
+def timed(func):
+    """Measure every call of a function
+
+    Args:
+        func (function): The function to measure
+
+    Returns:
+        function: The measured function
+    """
+
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with measure(name, [*args, *kwargs.values()]) as record:
+            result = func(*args, **kwargs)
+            describe(record, result)
+        return result
+
+    return wrapper
+
+
+def capture(func, *args):
+    """Call a function in a worker process and return its measurements
+
+    Args:
+        func (function): The function to call
+        *args: The arguments to func
+
+    Returns:
+        tuple: The result of func(*args) and the measurements it made
+    """
+
+    # Forget the measurements inherited from a forked parent
+    del records[:]
+    local.stack = []
+    result = func(*args)
+    return result, list(records)
+
+
+def collect(measurements):
+    """Add the measurements returned by a worker process
+
+    Args:
+        measurements (list): The measurements made by the worker
+    """
+
+    stack = local.__dict__.setdefault("stack", [])
+    for record in measurements:
+        if stack:
+            record["name"] = f"{stack[-1]['name']}/{record['name']}"
+        records.append(record)
+
+
+def report(fname, stages=None):
+    """Write the measurements of the run to a JSON file
+
+    Args:
+        fname (str): The name of the file
+        stages (dict, optional): The status of each pipeline stage.
+            Defaults to None.
+    """
+
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    with open(fname, "w") as f:
+        json.dump(
+            {
+                "wall_s": time.perf_counter() - START,
+                "memory": settings["memory"],
+                "stages": {
+                    name: {k: record[k] for k in ["status", "reason"]}
+                    for name, record in (stages or {}).items()
+                },
+                "measurements": sorted(records, key=lambda r: r["start_s"]),
+            },
+            f,
+            indent=2,
+        )
+    logger.info(f"Saved run report to {fname}")
+
+
+def profile(fname, func, *args, **kwargs):
+    """Call a function under cProfile and dump the statistics
+
+    The dump can be read with pstats or a viewer such as snakeviz.
+
+    Args:
+        fname (str): The name of the file
+        func (function): The function to call
+        *args: The arguments to func
+        **kwargs: The keyword arguments to func
+
+    Returns:
+        object: The result of func(*args, **kwargs)
+    """
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+        profiler.dump_stats(fname)
+        logger.info(f"Saved profile to {fname}")
@@ -0,0 +1,141 @@
+import logging
+import numpy as np
+import pandas as pd
+from . import helper, instrument
+
+logger = logging.getLogger(__name__)
+
+# Store the variables packed into a single integer key
+GROUP_VARS = ["Course", "Program", "Instructor ID"]
+
+# Store the bits of the program code and of the instructor ID in the key
+PROGRAM_BITS = 3
+ID_BITS = 32
+
+# Store the number of unmatched keys named for each source
+SHOWN = 5
+
+
+def pack(df, on=GROUP_VARS):
+    """Pack the course, program and instructor ID into an integer key
+
+    The key is Course << 35 | program << 32 | Instructor ID, which is
+    unique for course numbers below 2 ** 28. The program or instructor is
+    left as 0 when it is not part of the key.
+
+    Args:
+        df (DataFrame): The df with the key variables
+        on (list, optional): The key variables, Course and any of the other
+            GROUP_VARS. Defaults to GROUP_VARS.
+
+    Returns:
+        ndarray: The int64 key of each row
+    """
+
+    key = df["Course"].to_numpy(dtype=np.int64) << (PROGRAM_BITS + ID_BITS)
+    if "Program" in on:
+        program = df["Program"].astype(helper.schema["Program"]).cat.codes
+        key |= program.to_numpy(dtype=np.int64) << ID_BITS
+    if "Instructor ID" in on:
+        key |= df["Instructor ID"].to_numpy(dtype=np.int64)
+    return key
+
+
+def keys(df, on):
+    """Create the integer key of each row
+
+    Args:
+        df (DataFrame): The df
+        on (list): The names of the key variables, either a single integer
+            column or Course and any of the other GROUP_VARS
+
+    Returns:
+        ndarray: The int64 key of each row
+    """
+
+    if len(on) == 1:
+        return df[on[0]].to_numpy(dtype=np.int64)
+    if "Course" in on and set(on) <= set(GROUP_VARS):
+        return pack(df, on)
+    raise ValueError(f"Cannot create an integer key on {on}")
+
+
+def lookup(df, index, other, on, name):
+    """Align a source with the rows of the course overview
+
+    Args:
+        df (DataFrame): The course overview
+        index (ndarray): The key of each row of df
+        other (DataFrame): The source with one row per key
+        on (list): The names of the key variables
+        name (str): The name of the source
+
+    Returns:
+        DataFrame: The values of other aligned with df, missing where a key
+            has no match
+    """
+
+    values = other.drop(columns=on)
+    values.index = pd.Index(keys(other, on))
+    if not values.index.is_unique:
+        raise ValueError(f"The {name} have repeated keys on {on}")
+    aligned = values.reindex(index)
+    aligned.index = df.index
+
+    # Report the rows and distinct keys without a match
+    matched = values.index.get_indexer(index) >= 0
+    rate = matched.mean() if len(matched) else 1.0
+    unmatched = df[~matched].drop_duplicates(on)
+    logger.info(f"Matched {rate:.1%} of {len(df)} courses with the {name}")
+    if len(unmatched):
+        # Name the instructors rather than their IDs
+        shown = [c for c in ["Course", "Program", "Last Name"] if c in on]
+        shown += ["Last Name"] * ("Instructor ID" in on)
+        examples = "; ".join(
+            " ".join(str(v) for v in row)
+            for row in unmatched[shown].head(SHOWN).itertuples(index=False)
+        )
+        logger.info(
+            f"{len(unmatched)} keys have no {name}, such as {examples}"
+        )
+    instrument.annotate(
+        **{f"{name} match rate": rate, f"{name} unmatched": len(unmatched)}
+    )
+    return aligned
+
+
+@instrument.timed
+def main(df, sources):
+    """Left join every source onto the course overview in a single pass
+
+    Each source is aligned with the rows of the overview through its integer
+    key, and the overview and the aligned sources are combined once.
+
+    Args:
+        df (DataFrame): The course overview
+        sources (list): Tuples of the name of a source, its df and the names
+            of its key variables. A source whose key is None is already
+            aligned with the rows of df.
+
+    Returns:
+        DataFrame: The joined course overview
+    """
+
+    df = df.reset_index(drop=True)
+    indexes = {}
+    parts = [df]
+    for name, other, on in sources:
+        if on is None:
+            parts.append(other.set_axis(df.index))
+            continue
+        key = tuple(on)
+        if key not in indexes:
+            indexes[key] = keys(df, on)
+        parts.append(lookup(df, indexes[key], other, list(on), name))
+
+    # Refuse sources that would repeat a column
+    columns = pd.Index(np.concatenate([p.columns for p in parts]))
+    repeated = columns[columns.duplicated()].unique()
+    if len(repeated):
+        raise ValueError(f"The sources repeat columns: {list(repeated)}")
+    return pd.concat(parts, axis=1)
@@ -0,0 +1,174 @@
+import importlib.util
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from . import instrument
+
+logger = logging.getLogger(__name__)
+
+# Store the formats that can be written
+FORMATS = ["xlsx", "csv", "parquet"]
+
+# Store the sheets holding the raw data rather than the overview
+RAW = ["Price History", "Course Evaluations"]
+
+# Store the libraries pandas can write parquet with
+PARQUET_ENGINES = ["pyarrow", "fastparquet"]
+
+# Store the number of rows converted at a time when streaming to excel
+CHUNKSIZE = 10000
+
+
+def select(sheets, skip_raw=False):
+    """Select the sheets to write
+
+    Args:
+        sheets (dict): The df of each sheet in order
+        skip_raw (bool, optional): Whether to leave out the raw data sheets.
+            Defaults to False.
+
+    Returns:
+        dict: The df of each selected sheet in order
+    """
+
+    return {
+        name: df
+        for name, df in sheets.items()
+        if not (skip_raw and name in RAW)
+    }
+
+
+def check(formats):
+    """Check that every format is known and can be written
+
+    Args:
+        formats (list): The formats to write
+
+    Raises:
+        ValueError: If a format is unknown
+        ImportError: If parquet is asked for without a parquet engine
+    """
+
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats: {sorted(unknown)}")
+    if "parquet" in formats and not any(
+        importlib.util.find_spec(engine) for engine in PARQUET_ENGINES
+    ):
+        raise ImportError(
+            f"Writing parquet needs one of {PARQUET_ENGINES} installed"
+        )
+
+
+def files(stem, sheets, formats):
+    """Name the files written for each format
+
+    The excel file holds every sheet, while each sheet gets its own sidecar
+    file in the other formats. The Planner sidecar keeps the plain name.
+
+    Args:
+        stem (str): The name of the files without extension
+        sheets (list): The names of the sheets
+        formats (list): The formats to write
+
+    Returns:
+        dict: The name of each file and the sheets it holds
+    """
+
+    check(formats)
+    named = {}
+    for fmt in formats:
+        if fmt == "xlsx":
+            named[f"{stem}.xlsx"] = list(sheets)
+            continue
+        for sheet in sheets:
+            if sheet == "Planner":
+                fname = f"{stem}.{fmt}"
+            else:
+                slug = sheet.lower().replace(" ", "_")
+                fname = f"{stem}_{slug}.{fmt}"
+            named[fname] = [sheet]
+    return named
+
+
+@instrument.timed
+def write_excel(fname, sheets):
+    """Stream the sheets into an excel file row by row
+
+    The workbook is written in constant memory mode, where each row is
+    flushed to disk once the next one starts.
+
+    Args:
+        fname (str): The name of the file
+        sheets (dict): The df of each sheet in order
+    """
+
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(fname, {"constant_memory": True})
+    header = wb.add_format(
+        {"bold": True, "border": 1, "align": "center", "valign": "top"}
+    )
+    for name, df in sheets.items():
+        ws = wb.add_worksheet(name)
+        ws.write_row(0, 0, [str(c) for c in df.columns], header)
+
+        # Convert a chunk of rows at a time, writing missing values as blanks
+        for start in range(0, len(df), CHUNKSIZE):
+            chunk = df.iloc[start : start + CHUNKSIZE].astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            for r, row in enumerate(chunk.itertuples(False, None), start):
+                ws.write_row(r + 1, 0, row)
+    wb.close()
+
+
+@instrument.timed
+def write_sidecar(fname, df):
+    """Write a sheet to a csv or parquet file
+
+    Args:
+        fname (str): The name of the file
+        df (DataFrame): The sheet to write
+    """
+
+    if fname.endswith(".csv"):
+        df.to_csv(fname, index=False)
+    else:
+        df.to_parquet(fname, index=False)
+
+
+def write(stem, sheets, formats=("xlsx",), skip_raw=False):
+    """Write the course overview in each format in parallel
+
+    Args:
+        stem (str): The name of the files without extension
+        sheets (dict): The df of each sheet in order
+        formats (list, optional): The formats to write. Defaults to xlsx.
+        skip_raw (bool, optional): Whether to leave out the raw data sheets.
+            Defaults to False.
+
+    Returns:
+        list: The names of the files written
+    """
+
+    sheets = select(sheets, skip_raw)
+    named = files(stem, sheets, formats)
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+
+    # Measure each file within the measurement of the caller
+    parent = instrument.current()
+    with ThreadPoolExecutor(max_workers=len(named) or 1) as pool:
+        futures = []
+        for fname, names in named.items():
+            if fname.endswith(".xlsx"):
+                subset = {name: sheets[name] for name in names}
+                task = (write_excel, fname, subset)
+            else:
+                task = (write_sidecar, fname, sheets[names[0]])
+            futures.append(pool.submit(instrument.within, parent, *task))
+        for future in futures:
+            future.result()
+
+    for fname in named:
+        logger.info(f"Saved course planner to {fname}")
+    return list(named)
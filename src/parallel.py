@@ -0,0 +1,62 @@
+from . import cache, instrument
+
+
+def configure(settings, measuring):
+    """Configure a worker process like its parent
+
+    Args:
+        settings (dict): The cache settings of the parent
+        measuring (dict): The instrumentation settings of the parent
+    """
+
+    cache.configure(**settings)
+    instrument.configure(**measuring)
+
+
+def pool(workers):
+    """Create a process pool sharing the cache and instrumentation settings
+
+    Args:
+        workers (int): The number of worker processes
+
+    Returns:
+        ProcessPoolExecutor: The process pool
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure,
+        initargs=(dict(cache.settings), dict(instrument.settings)),
+    )
+
+
+def run(tasks, workers=1):
+    """Run independent tasks, in parallel when there are several workers
+
+    Args:
+        tasks (list): Tuples of a function followed by its arguments
+        workers (int, optional): The number of worker processes. Defaults
+            to 1, which runs the tasks in the current process.
+
+    Returns:
+        list: The result of each task in the order given
+    """
+
+    tasks = list(tasks)
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(*args) for func, *args in tasks]
+
+    # Bring back the measurements made in each worker with its result
+    with pool(min(workers, len(tasks))) as executor:
+        futures = [
+            executor.submit(instrument.capture, func, *args)
+            for func, *args in tasks
+        ]
+        results = []
+        for future in futures:
+            result, measurements = future.result()
+            instrument.collect(measurements)
+            results.append(result)
+        return results
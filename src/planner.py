@@ -0,0 +1,204 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from . import build
+
+# Store the columns indexed by their exact values
+EXACT = [
+    "Quarter",
+    "Program",
+    "Last Name",
+    "First Name",
+    "Day",
+    "Time",
+    "Session",
+]
+
+# Store the columns shown for every query
+DISPLAY = [
+    "Course",
+    "Title",
+    "Quarter",
+    "Program",
+    "Section",
+    "Last Name",
+    "Day",
+    "Time",
+]
+
+
+class Planner:
+    """A course overview with prebuilt indexes for compound queries
+
+    Columns in EXACT map each value to the positions of its rows, and
+    numeric columns, including each requirement area, keep their values in
+    sorted order so that ranges are found by binary search. A query
+    intersects the positions matched by each of its filters.
+
+    Args:
+        df (DataFrame): The merged course overview
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.exact = {}
+        self.ranges = {}
+        for column in self.df.columns:
+            values = self.df[column]
+            if column in EXACT:
+                groups = values.groupby(values, observed=True, sort=False)
+                self.exact[column] = {
+                    k: np.sort(v) for k, v in groups.indices.items()
+                }
+            elif is_numeric_dtype(values) and values.dtype != bool:
+                numbers = values.to_numpy(dtype=float, na_value=np.nan)
+                order = np.argsort(numbers, kind="stable")
+                self.ranges[column] = (numbers[order], order)
+
+    def positions(self, column, condition):
+        """Find the rows matching a condition on a column
+
+        Args:
+            column (str): The name of the column
+            condition (object): A value, a list of values, or a (low, high)
+                tuple of inclusive bounds where None is unbounded
+
+        Returns:
+            ndarray: The sorted positions of the matching rows
+        """
+
+        if column not in self.df.columns:
+            raise KeyError(f"Unknown column: {column}")
+
+        # Look up exact values, taking the union over a list
+        if column in self.exact and not isinstance(condition, tuple):
+            values = condition if isinstance(condition, list) else [condition]
+            index = self.exact[column]
+            found = [index[v] for v in values if v in index]
+            if not found:
+                return np.array([], dtype=np.intp)
+            return np.unique(np.concatenate(found))
+
+        # Binary search the sorted values of a range
+        if column in self.ranges:
+            if not isinstance(condition, tuple):
+                condition = (condition, condition)
+            low, high = condition
+            numbers, order = self.ranges[column]
+            start = 0 if low is None else np.searchsorted(numbers, low, "left")
+            stop = np.searchsorted(
+                numbers, np.inf if high is None else high, "right"
+            )
+            return np.sort(order[start:stop])
+
+        # Otherwise scan the column
+        values = self.df[column]
+        if isinstance(condition, tuple):
+            low, high = condition
+            mask = pd.Series(True, index=values.index)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        elif isinstance(condition, list):
+            mask = values.isin(condition)
+        else:
+            mask = values == condition
+        return np.flatnonzero(mask.fillna(False).to_numpy(dtype=bool))
+
+    def select(self, filters):
+        """Select the courses matching every filter
+
+        Args:
+            filters (dict): The condition on each column, as described in
+                Planner.positions
+
+        Returns:
+            DataFrame: The matching courses
+        """
+
+        if not filters:
+            return self.df
+        return self.df.iloc[self.match(filters)]
+
+    def match(self, filters):
+        """Find the rows of the courses matching every filter
+
+        Args:
+            filters (dict): The condition on each column, as described in
+                Planner.positions
+
+        Returns:
+            ndarray: The sorted positions of the matching rows
+        """
+
+        matches = [self.positions(c, v) for c, v in filters.items()]
+        if not matches:
+            return np.arange(len(self.df))
+
+        # Intersect from the smallest set of positions
+        matches.sort(key=len)
+        selected = matches[0]
+        for positions in matches[1:]:
+            if len(selected) == 0:
+                break
+            selected = np.intersect1d(selected, positions, assume_unique=True)
+        return selected
+
+
+def parse(expressions):
+    """Parse query expressions into filters
+
+    Each expression is "Column=Value", "Column>=Value" or "Column<=Value".
+    A bare column name selects the courses satisfying that requirement.
+
+    Args:
+        expressions (list): The query expressions
+
+    Returns:
+        dict: The condition on each column
+    """
+
+    filters = {}
+    for expression in expressions:
+        match = re.match(r"^\s*(.+?)\s*(>=|<=|=)\s*(.*?)\s*$", expression)
+        if match is None:
+            filters[expression.strip()] = 1.0
+            continue
+
+        column, op, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+
+        # Combine bounds given for the same column
+        previous = filters.get(column)
+        low, high = previous if isinstance(previous, tuple) else (None, None)
+        if op == ">=":
+            filters[column] = (value, high)
+        elif op == "<=":
+            filters[column] = (low, value)
+        else:
+            filters[column] = value
+    return filters
+
+
+def load(fname=os.path.join("output", "manifest.json")):
+    """Load the planner indexed by the last run of main.py
+
+    Args:
+        fname (str, optional): The name of the manifest file. Defaults to
+            output/manifest.json.
+
+    Returns:
+        Planner: The indexed course overview
+
+    Raises:
+        FileNotFoundError: If the last run did not leave a planner built by
+            the current code
+    """
+
+    return build.Manifest(fname).require("index", Planner, "indexed planner")
@@ -0,0 +1,336 @@
+import logging
+import os
+import re
+import numpy as np
+import pandas as pd
+from . import build
+
+logger = logging.getLogger(__name__)
+
+# Match the course numbers named in a prerequisite
+COURSE = re.compile(r"\b(\d{5})\b")
+
+# Match the sentences ruling a course out, such as "Students may not take
+# this course if they have taken 34969."
+EXCLUSION = re.compile(
+    r"\b(?:may not|cannot|can not|not open to|no credit)\b", re.IGNORECASE
+)
+
+# Match the sentences that only advise, or that can be met without the
+# courses named, such as "30000 strongly recommended" or "30000 or consent
+# of instructor", which are not enforced
+SOFT = re.compile(
+    r"\b(?:recommended|suggested|encouraged|helpful|preferred|consent|"
+    r"permission|approval|equivalent)\b",
+    re.IGNORECASE,
+)
+
+# Split a requirement into clauses that must all hold, where the courses of
+# a clause joined by "or", including a serial list such as "30000, 30001, or
+# 30116", are alternatives
+SENTENCE = re.compile(r"[.;]\s*")
+CLAUSE = re.compile(r"\band\b|\bplus\b|&", re.IGNORECASE)
+ALTERNATIVE = re.compile(r"\bor\b", re.IGNORECASE)
+
+
+def parse(text):
+    """Parse a prerequisite into required and excluded courses
+
+    A part of a sentence joined by "and" is one clause when it contains
+    "or", and otherwise each course it lists is a clause of its own.
+    Sentences that advise or that can be met another way are ignored.
+
+    Args:
+        text (str): The prerequisite, such as "Business 34104 or 38086
+            required."
+
+    Returns:
+        tuple: The clauses of alternative courses that must all be taken,
+            and the courses that must not have been taken
+
+    Examples:
+        >>> parse("Business 34104 or 38086 required.")
+        ([(34104, 38086)], [])
+        >>> parse("Business 30000, 30001, or 30116 required.")
+        ([(30000, 30001, 30116)], [])
+        >>> parse("Business 30000 and 30001, or 30116 required.")
+        ([(30000,), (30001, 30116)], [])
+        >>> parse("Business 30000, 30001 and 30116 required.")
+        ([(30000,), (30001,), (30116,)], [])
+        >>> parse("Business 30000 or consent of instructor.")
+        ([], [])
+        >>> parse("Business 30000 required; 30116 strongly recommended.")
+        ([(30000,)], [])
+        >>> parse("Not open to students who have taken 34969.")
+        ([], [34969])
+    """
+
+    clauses, excluded = [], []
+    if not isinstance(text, str):
+        return clauses, excluded
+    for sentence in SENTENCE.split(text):
+        if EXCLUSION.search(sentence):
+            excluded.extend(int(c) for c in COURSE.findall(sentence))
+            continue
+        if SOFT.search(sentence):
+            continue
+        for part in CLAUSE.split(sentence):
+            courses = sorted({int(c) for c in COURSE.findall(part)})
+            if ALTERNATIVE.search(part):
+                clauses.append(tuple(courses))
+            else:
+                clauses.extend((c,) for c in courses)
+    return [c for c in clauses if c], excluded
+
+
+def decode(bits, n):
+    """Find the positions of the set bits of a bitset
+
+    Args:
+        bits (int): The bitset
+        n (int): The number of bits
+
+    Returns:
+        ndarray: The positions of the set bits
+    """
+
+    raw = np.frombuffer(bits.to_bytes((n + 7) // 8, "little"), np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:n])
+
+
+class Graph:
+    """A prerequisite graph of the courses with precomputed closures
+
+    The required courses are stored as compressed sparse rows from each
+    course to its clauses and from each clause to its alternative courses,
+    and the excluded courses as rows from each course. Each course also
+    keeps the bitset of its clauses, exclusions and of every course it
+    transitively depends on, where bit i is the course in position i of
+    courses. A set of taken courses is a bitset in the same positions, so
+    checking a course is a few integer operations.
+
+    Args:
+        df (DataFrame): The course schedule with Course and Prerequisites
+    """
+
+    def __init__(self, df):
+        # Parse each distinct prerequisite once
+        rows = df[["Course", "Prerequisites"]].dropna(subset=["Course"])
+        rows = rows.drop_duplicates()
+        parsed = {}
+        for course, text in zip(rows["Course"], rows["Prerequisites"]):
+            clauses, excluded = parse(text)
+            entry = parsed.setdefault(int(course), (set(), set()))
+            entry[0].update(clauses)
+            entry[1].update(excluded)
+
+        # Number every course in the schedule or named as a prerequisite
+        named = {
+            c
+            for clauses, excluded in parsed.values()
+            for c in [*excluded, *(c for clause in clauses for c in clause)]
+        }
+        self.courses = np.array(sorted({*parsed, *named}), dtype=np.int64)
+        self.position = {c: i for i, c in enumerate(self.courses.tolist())}
+        n = len(self.courses)
+
+        # Store the clauses and exclusions as compressed sparse rows
+        alternatives, excludes = [], []
+        self.clause_ptr = np.zeros(n + 1, dtype=np.int64)
+        self.exclude_ptr = np.zeros(n + 1, dtype=np.int64)
+        for i, course in enumerate(self.courses.tolist()):
+            required, excluded = parsed.get(course, ((), ()))
+            for clause in sorted(required):
+                alternatives.append([self.position[c] for c in clause])
+            excludes.extend(sorted(self.position[c] for c in excluded))
+            self.clause_ptr[i + 1] = len(alternatives)
+            self.exclude_ptr[i + 1] = len(excludes)
+        lengths = [len(a) for a in alternatives]
+        self.alternative_ptr = np.r_[0, np.cumsum(lengths, dtype=np.int64)]
+        self.alternatives = np.array(
+            [a for clause in alternatives for a in clause], dtype=np.int64
+        )
+        self.excludes = np.array(excludes, dtype=np.int64)
+
+        # Encode the clauses and exclusions of each course as bitsets
+        self.clauses = [sum(1 << a for a in set(c)) for c in alternatives]
+        self.excluded = [
+            sum(1 << e for e in set(self.excludes[s:t].tolist()))
+            for s, t in zip(self.exclude_ptr[:-1], self.exclude_ptr[1:])
+        ]
+
+        # Close the required courses transitively, repeating until stable
+        direct = [
+            [a for clause in alternatives[s:t] for a in clause]
+            for s, t in zip(self.clause_ptr[:-1], self.clause_ptr[1:])
+        ]
+        self.closure = [sum(1 << a for a in set(d)) for d in direct]
+        changed = True
+        while changed:
+            changed = False
+            for i, prerequisites in enumerate(direct):
+                closure = self.closure[i]
+                for j in prerequisites:
+                    closure |= self.closure[j]
+                if closure != self.closure[i]:
+                    self.closure[i] = closure
+                    changed = True
+        logger.info(
+            f"Parsed {len(self.clauses)} required and {len(self.excludes)} "
+            f"excluded prerequisites of {n} courses"
+        )
+
+    def bits(self, courses):
+        """Encode courses as a bitset, ignoring courses not in the graph
+
+        Args:
+            courses (iterable): The course numbers
+
+        Returns:
+            int: The bitset of the courses
+        """
+
+        bits = 0
+        for course in courses:
+            if int(course) in self.position:
+                bits |= 1 << self.position[int(course)]
+        return bits
+
+    def eligible(self, course, taken):
+        """Check whether a course can be taken after the taken courses
+
+        Args:
+            course (int): The course number
+            taken (int): The bitset of the taken courses, as in Graph.bits
+
+        Returns:
+            bool: Whether every clause has a taken course and no excluded
+                course was taken
+        """
+
+        i = self.position.get(int(course))
+        if i is None:
+            return True
+        if self.excluded[i] & taken:
+            return False
+        start, stop = self.clause_ptr[i], self.clause_ptr[i + 1]
+        return all(clause & taken for clause in self.clauses[start:stop])
+
+    def available(self, courses):
+        """Find every course that can be taken after the taken courses
+
+        Args:
+            courses (iterable): The course numbers taken
+
+        Returns:
+            ndarray: The course numbers that can be taken and were not
+        """
+
+        return self.courses[self.mask(courses)]
+
+    def unlocked(self, courses):
+        """Find the courses with prerequisites satisfied by the taken courses
+
+        Args:
+            courses (iterable): The course numbers taken
+
+        Returns:
+            ndarray: The course numbers with required courses that can be
+                taken and were not
+        """
+
+        required = np.diff(self.clause_ptr) > 0
+        return self.courses[self.mask(courses) & required]
+
+    def mask(self, courses):
+        """Mark the courses that can be taken after the taken courses
+
+        Every clause and exclusion is checked at once over the sparse rows.
+
+        Args:
+            courses (iterable): The course numbers taken
+
+        Returns:
+            ndarray: Whether each course in courses can be taken and was not
+        """
+
+        n = len(self.courses)
+        done = np.isin(self.courses, np.asarray(list(courses), np.int64))
+        clause_of = np.repeat(
+            np.arange(len(self.clauses)), np.diff(self.alternative_ptr)
+        )
+        met = np.bincount(
+            clause_of, done[self.alternatives], len(self.clauses)
+        )
+        course_of = np.repeat(np.arange(n), np.diff(self.clause_ptr))
+        missing = np.bincount(course_of, met == 0, n)
+        course_of = np.repeat(np.arange(n), np.diff(self.exclude_ptr))
+        blocked = np.bincount(course_of, done[self.excludes], n)
+        return (missing == 0) & (blocked == 0) & ~done
+
+    def before(self, course):
+        """Find every course a course transitively depends on
+
+        Args:
+            course (int): The course number
+
+        Returns:
+            ndarray: The course numbers named by its prerequisites, by their
+                prerequisites and so on
+        """
+
+        i = self.position.get(int(course))
+        if i is None:
+            return self.courses[:0]
+        return self.courses[decode(self.closure[i], len(self.courses))]
+
+    def edges(self):
+        """List the prerequisites as edges between courses
+
+        Returns:
+            DataFrame: The Course, the Prerequisite course, whether it is
+                Required or Excluded, and the Clause numbering the
+                alternatives of each course
+        """
+
+        n = len(self.courses)
+        clause_of = np.repeat(
+            np.arange(len(self.clauses)), np.diff(self.alternative_ptr)
+        )
+        course_of = np.repeat(np.arange(n), np.diff(self.clause_ptr))
+        required = pd.DataFrame(
+            {
+                "Course": self.courses[course_of[clause_of]],
+                "Prerequisite": self.courses[self.alternatives],
+                "Kind": "Required",
+                "Clause": clause_of - self.clause_ptr[course_of[clause_of]],
+            }
+        )
+        excluded = pd.DataFrame(
+            {
+                "Course": np.repeat(self.courses, np.diff(self.exclude_ptr)),
+                "Prerequisite": self.courses[self.excludes],
+                "Kind": "Excluded",
+                "Clause": -1,
+            }
+        )
+        return pd.concat([required, excluded], ignore_index=True)
+
+
+def load(fname=os.path.join("output", "manifest.json")):
+    """Load the prerequisite graph built by the last run of main.py
+
+    Args:
+        fname (str, optional): The name of the manifest file. Defaults to
+            output/manifest.json.
+
+    Returns:
+        Graph: The prerequisite graph
+
+    Raises:
+        FileNotFoundError: If the last run did not leave a graph built by
+            the current code
+    """
+
+    manifest = build.Manifest(fname)
+    return manifest.require("prerequisites", Graph, "prerequisite graph")
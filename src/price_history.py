@@ -1,8 +1,21 @@
+import hashlib
+import logging
 import os
 import re
+import struct
 import numpy as np
 import pandas as pd
-from . import helper
+from . import cache, helper, instrument, parallel
+
+logger = logging.getLogger(__name__)
+
+# Store the name of the price history file
+FNAME = os.path.join("data", "course price history.xls")
+
+# Store the BIFF record types ending a sheet and of cells holding a
+# shared string, whose last four bytes index the shared string table
+EOF_RECORD = 0x000A
+LABELSST = 0x00FD
 
 
 def rename_columns(string):
@@ -46,26 +59,17 @@ def read_sheet(xls, name):
     # Starting at the second row
     df = pd.read_excel(xls, name, skiprows=1)
 
-    # Split the instructor names
-    # TODO: Do this in a simpler regex statement
-    df["Instructor"] = df["Instructor"].str.replace(
-        r"\(Katja\)", "", regex=True
-    )
-    df["Instructor"] = df["Instructor"].str.replace(
-        r"(\S+, \S+) ?\;(.+, .+)", r"\1", regex=True
-    )
-    df[["Last Name", "First Name"]] = df["Instructor"].str.split(
-        ", ", expand=True
-    )
+    # Split the instructor names, keeping the first of several
+    df = df.join(helper.names(df["Instructor"]))
 
     # Get the new quarter numbers
-    df["Quarter"] = df["Quarter"].map(helper.qtr_to_quarter)
+    df["Quarter"] = helper.quarters(df["Quarter"])
 
     # Create a course number and section from the original
     df[["Course", "Section"]] = df.Course.str.split("-", expand=True)
     df["Course"] = df["Course"].astype(int)
     df["Section"] = df["Section"].astype(int)
-    df["Program"] = df["Section"].map(helper.section_to_program)
+    df["Program"] = helper.programs(df["Section"])
 
     # Drop certain columns
     # TODO: Can probably extract day and time from this
@@ -80,7 +84,6 @@ def read_sheet(xls, name):
     df = df.replace("CLO", "0")
     df = df.convert_dtypes()
     cols_obj = list(df.select_dtypes(include=[object]).columns)
-    cols_obj.remove("Quarter")
     df[cols_obj] = df[cols_obj].apply(pd.to_numeric)
     # TODO: Should we really fillna here?
     df = df.fillna(0)
@@ -89,24 +92,164 @@ def read_sheet(xls, name):
     return df
 
 
-def main():
+def layout(book):
+    """Find the raw records of each sheet in an xlrd workbook
+
+    This is the only place relying on the private attributes of xlrd 2.0,
+    the version pinned in environment.yml.
+
+    Args:
+        book (Book): The xlrd workbook opened on demand
+
+    Returns:
+        tuple: The workbook stream, the offset of each sheet in it, the
+            shared strings and the date formats of the workbook, or None
+            if this version of xlrd does not expose them
+    """
+
+    try:
+        formats = (
+            book.datemode,
+            sorted(book._xf_index_to_xl_type_map.items()),
+        )
+        return book.mem, book._sh_abs_posn, book._sharedstrings, formats
+    except AttributeError:
+        logger.warning("Cannot read the sheet records of this xlrd version")
+        return None
+
+
+def sheet_digests(book, fname):
+    """Create a cache key for each sheet from its raw records
+
+    The records of each sheet are hashed as stored in the workbook, from
+    its BOF record to its EOF record, without parsing the cells, together
+    with the shared strings they reference and the date formats of the
+    workbook, so appending a sheet leaves the keys of the others unchanged.
+
+    Args:
+        book (Book): The xlrd workbook opened on demand
+        fname (str): The name of the file, whose fingerprint keys every
+            sheet when the records cannot be read
+
+    Returns:
+        dict: The cache key of each cleaned sheet by name
+    """
+
+    found = layout(book)
+    if found is None:
+        fingerprint = cache.fingerprint(fname)
+        return {
+            name: cache.key(read_sheet, name, fingerprint)
+            for name in book.sheet_names()
+        }
+    mem, starts, shared, formats = found
+
+    digests = {}
+    for name, start in zip(book.sheet_names(), starts):
+        # Walk the records of the sheet, collecting its shared strings
+        sha = hashlib.sha256()
+        position = start
+        while position + 4 <= len(mem):
+            kind, size = struct.unpack_from("<HH", mem, position)
+            if kind == LABELSST and size >= 10:
+                (index,) = struct.unpack_from("<I", mem, position + 10)
+                if index < len(shared):
+                    sha.update(repr(shared[index]).encode())
+            position += 4 + size
+            if kind == EOF_RECORD:
+                break
+        sha.update(mem[start:position])
+        sha.update(repr(formats).encode())
+        digests[name] = cache.key(read_sheet, name, sha.hexdigest())
+    return digests
+
+
+@instrument.timed
+def read_sheets(fname, names):
+    """Read several sheets of the prices
+
+    Args:
+        fname (str): The name of the file
+        names (list): The names of the sheets
+
+    Returns:
+        list: The cleaned dataframe of each sheet
+    """
+
+    # Only load the requested sheets from the workbook
+    import xlrd
+
+    book = xlrd.open_workbook(fname, on_demand=True)
+    xls = pd.ExcelFile(book, engine="xlrd")
+    frames = [read_sheet(xls, name) for name in names]
+    book.release_resources()
+    return frames
+
+
+def main(workers=1):
+    """Reads the price history through the cache
+
+    Args:
+        workers (int, optional): The number of worker processes reading the
+            sheets in parallel. Defaults to 1.
+
+    Returns:
+        DataFrame: The cleaned price history
+    """
+
+    digest = cache.key(read, cache.fingerprint(FNAME))
+    return cache.memoize(digest, read, FNAME, workers)
+
+
+def read(fname, workers=1):
     """Reads the price history
 
+    Each cleaned sheet is cached by its name and raw records, so only
+    sheets that were added or changed since the last read are parsed.
+
+    Args:
+        fname (str): The name of the file
+        workers (int, optional): The number of worker processes reading the
+            sheets in parallel. Defaults to 1.
+
     Returns:
         DataFrame: The cleaned price history
     """
 
-    # Load the ExcelFile
-    fname = os.path.join("data", "course price history.xls")
-    print(f"Reading Price History from {fname}")
-    xls = pd.ExcelFile(fname)
+    # Fingerprint each sheet without parsing its cells
+    import xlrd
 
-    # Read in each sheet of the file
-    df = pd.concat([read_sheet(xls, name) for name in xls.sheet_names])
+    logger.info(f"Reading Price History from {fname}")
+    book = xlrd.open_workbook(fname, on_demand=True)
+    names = book.sheet_names()
+    digests = sheet_digests(book, fname)
+    book.release_resources()
+
+    # Split the sheets missing from the cache across the workers
+    frames = {name: cache.get(digests[name]) for name in names}
+    missing = [name for name in names if frames[name] is None]
+    logger.info(
+        f"Loaded {len(names) - len(missing)} of {len(names)} sheets from cache"
+    )
+    step = max(workers, 1)
+    chunks = [missing[i::step] for i in range(step) if missing[i::step]]
+    tasks = [(read_sheets, fname, chunk) for chunk in chunks]
+
+    # Read in each missing sheet and cache it
+    for chunk, results in zip(chunks, parallel.run(tasks, workers)):
+        for name, frame in zip(chunk, results):
+            cache.put(digests[name], frame)
+            frames[name] = frame
+
+    # Combine the sheets in the order of the workbook
+    df = pd.concat([frames[name] for name in names])
 
     # Replace missing values that appeared after concatenation
     df = df.fillna(np.nan)
 
+    # Encode the shared columns
+    df = helper.encode(df)
+
     # Order columns
     column_ordering = helper.column_ordering(df.columns, ["Total Seats"])
     df = df[column_ordering]
@@ -116,4 +259,3 @@ def main():
     df = df.sort_values(column_sorting)
 
     return df
-
@@ -1,8 +1,19 @@
+import logging
 import os
 import numpy as np
 import pandas as pd
+from . import instrument
 
+logger = logging.getLogger(__name__)
 
+# Store the names of the degree and concentration requirements files
+FNAMES = [
+    os.path.join("data", "degree_requirements.txt"),
+    os.path.join("data", "concentration_requirements.txt"),
+]
+
+
+@instrument.timed
 def read(fname):
     """Read a requirements file
 
@@ -14,7 +25,7 @@ def read(fname):
     """
 
     # Load the file
-    print(f"Reading Requirements from {fname}")
+    logger.info(f"Reading Requirements from {fname}")
     dictionary = {}
     with open(fname, "r") as f:
         # Each line contains Area: CourseNum, CourseNum
@@ -53,6 +64,57 @@ def lookup(course, dictionary):
     return df
 
 
+def index(dictionary):
+    """Invert the requirements dictionary
+
+    Args:
+        dictionary (dict): The requirements dictionary
+
+    Returns:
+        dict: A mapping from each course to the set of areas it satisfies
+    """
+
+    inverted = {}
+    for area, offering in dictionary.items():
+        for course in offering:
+            inverted.setdefault(course, set()).add(area)
+    return inverted
+
+
+def matrix(courses, dictionary):
+    """Create the course by area membership matrix
+
+    Args:
+        courses (list): The list of courses
+        dictionary (dict): The requirements dictionary
+
+    Returns:
+        ndarray: A boolean matrix with one row per course and one column
+            per area in the dictionary
+    """
+
+    # Flatten the inverted index into (course, area) pairs
+    areas = {area: i for i, area in enumerate(dictionary)}
+    pairs = [
+        (course, areas[area])
+        for course, matches in index(dictionary).items()
+        for area in matches
+    ]
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    pair_courses, pair_areas = pairs[:, 0], pairs[:, 1]
+
+    # Locate each paired course among the requested courses
+    codes, uniques = pd.factorize(courses)
+    rows = pd.Index(uniques).get_indexer(pair_courses)
+    found = rows >= 0
+
+    # Scatter the pairs into the matrix and expand to the requested courses
+    membership = np.zeros((len(uniques), len(areas)), dtype=bool)
+    membership[rows[found], pair_areas[found]] = True
+    return membership[codes]
+
+
+@instrument.timed
 def fill(courses, dictionary):
     """Fill a DataFrame for all the courses
 
@@ -65,14 +127,28 @@ def fill(courses, dictionary):
     """
 
     # Add the requirements matching
-    df = pd.concat([lookup(c, dictionary) for c in courses])
+    membership = matrix(courses, dictionary)
 
     # Replace with 1 and NaN for nicer viewing in Excel
-    df = df.replace(True, 1)
-    df = df.replace(False, np.nan)
+    values = np.where(membership, 1.0, np.nan)
+    df = pd.DataFrame(values, columns=list(dictionary))
+    df.insert(0, "Course", courses)
     return df
 
 
+def load():
+    """Read the degree and then the concentration requirements
+
+    Returns:
+        dict: The courses of each requirement area
+    """
+
+    dictionary = {}
+    for fname in FNAMES:
+        dictionary.update(read(fname))
+    return dictionary
+
+
 def main(courses):
     """Load the requirements file
 
@@ -83,14 +159,6 @@ def main(courses):
         DataFrame: The dataframe for the courses
     """
 
-    # Read the degree requirements
-    fname_degree = os.path.join("data", "degree_requirements.txt")
-    dictionary = read(fname_degree)
-
-    # Read the concentration requirements
-    fname_conc = os.path.join("data", "concentration_requirements.txt")
-    dictionary.update(read(fname_conc))
-
     # Fill the courses as a dataframe
-    df = fill(courses, dictionary)
+    df = fill(courses, load())
     return df
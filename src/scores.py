@@ -0,0 +1,163 @@
+import logging
+import numpy as np
+import pandas as pd
+from . import helper, instrument, join
+
+logger = logging.getLogger(__name__)
+
+# Store the questions scored in the course evaluations
+QUESTIONS = [
+    "Hours Per Week",
+    "Convey Clearly",
+    "Convey Interesting",
+    "Useful Tools",
+    "Out Of Course",
+    "Recommend Course",
+]
+
+# Store the levels scored, from the most to the least specific
+LEVELS = {
+    "Instructor": ["Course", "Instructor ID"],
+    "Course": ["Course"],
+}
+
+
+def responses(df):
+    """Count the responses behind each evaluation
+
+    The BLUE exports count the responses, while the historical file only
+    has the enrollment and the percent responding.
+
+    Args:
+        df (DataFrame): The course evaluations
+
+    Returns:
+        ndarray: The number of responses of each evaluation
+    """
+
+    estimated = df["Enrollment"].to_numpy(float, na_value=np.nan)
+    estimated *= df["Percent Responses"].to_numpy(float, na_value=np.nan)
+    estimated /= 100
+    if "Responses" in df.columns:
+        counted = df["Responses"].to_numpy(float, na_value=np.nan)
+        estimated = np.where(np.isnan(counted), estimated, counted)
+    return np.nan_to_num(estimated, nan=0.0)
+
+
+def weights(df, half_life=None):
+    """Weigh each evaluation by its responses and optionally by its age
+
+    Args:
+        df (DataFrame): The course evaluations
+        half_life (float, optional): The number of terms over which the
+            weight of an evaluation halves, counted back from the latest
+            term. Defaults to None, which weighs every term the same.
+
+    Returns:
+        ndarray: The weight of each evaluation
+    """
+
+    if half_life is not None and not half_life > 0:
+        raise ValueError(f"The half-life must be above 0, not {half_life}")
+    w = responses(df)
+    if half_life is not None and len(df):
+        term = helper.term(df["Year"], df["Quarter"])
+        w *= 0.5 ** ((term.max() - term) / half_life)
+    return w
+
+
+def moments(codes, n, w, x):
+    """Sum the weights, weighted values and weighted squares of each group
+
+    Args:
+        codes (ndarray): The group of each evaluation
+        n (int): The number of groups
+        w (ndarray): The weight of each evaluation
+        x (ndarray): The value of each evaluation, NaN when not answered
+
+    Returns:
+        tuple: The sums of w, w * x and w * x ** 2 of each group
+    """
+
+    answered = ~np.isnan(x)
+    w = np.where(answered, w, 0)
+    x = np.where(answered, x, 0)
+    wx = w * x
+    return (
+        np.bincount(codes, w, n),
+        np.bincount(codes, wx, n),
+        np.bincount(codes, wx * x, n),
+    )
+
+
+@instrument.timed
+def main(df, evals, half_life=None, questions=QUESTIONS):
+    """Score each section from the evaluations of its course and instructor
+
+    The evaluations of every term and program are pooled into a
+    response-weighted mean and standard deviation of each question, first
+    for the course taught by the same instructor and then for the course as
+    a whole. A section falls back to the course scores when its instructor
+    has no evaluations of the course. Every group is summed in one pass of
+    np.bincount, so changing the weighting only repeats a few array sums.
+
+    Args:
+        df (DataFrame): The course schedule
+        evals (DataFrame): The course evaluations
+        half_life (float, optional): The number of terms over which the
+            weight of an evaluation halves. Defaults to None, which weighs
+            every term the same.
+        questions (list, optional): The questions to score. Defaults to
+            QUESTIONS.
+
+    Returns:
+        DataFrame: For each section, the weighted mean and standard
+            deviation of each question, the responses weighed and whether
+            the scores are of the instructor or the course, with the index
+            of df
+    """
+
+    questions = [q for q in questions if q in evals.columns]
+    w = weights(evals, half_life)
+    values = {q: evals[q].to_numpy(float, na_value=np.nan) for q in questions}
+
+    # Find the group of each section at each level, from the most specific
+    basis = np.full(len(df), None, dtype=object)
+    found = np.zeros(len(df), dtype=bool)
+    total = np.full(len(df), np.nan)
+    mean = {q: np.full(len(df), np.nan) for q in questions}
+    std = {q: np.full(len(df), np.nan) for q in questions}
+    for level, on in LEVELS.items():
+        codes, uniques = pd.factorize(join.keys(evals, on))
+        n = len(uniques)
+        position = pd.Index(uniques).get_indexer(join.keys(df, on))
+        sw = np.bincount(codes, w, n)
+        use = ~found & (position >= 0)
+        use[use] = sw[position[use]] > 0
+        g = position[use]
+        basis[use] = level
+        total[use] = sw[g]
+
+        # Pool the answers of each question in the group
+        for q in questions:
+            s0, s1, s2 = moments(codes, n, w, values[q])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mu = s1[g] / s0[g]
+                variance = np.maximum(s2[g] / s0[g] - mu * mu, 0)
+            mean[q][use] = mu
+            std[q][use] = np.sqrt(variance)
+        found |= use
+
+    scores = pd.DataFrame(index=df.index)
+    for q in questions:
+        scores[f"Weighted {q}"] = mean[q]
+        scores[f"Weighted {q} SD"] = std[q]
+    scores["Weighted Responses"] = total
+    scores["Evaluation Basis"] = pd.Categorical(basis, categories=[*LEVELS])
+    counts = scores["Evaluation Basis"].value_counts()
+    logger.info(
+        f"Scored {counts['Instructor']} sections by instructor and "
+        f"{counts['Course']} by course, with {len(df) - found.sum()} "
+        "never evaluated"
+    )
+    return scores
@@ -0,0 +1,398 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+import urllib.parse
+from . import build, course_evals, parallel, planner, price_history
+from . import requirements
+
+logger = logging.getLogger(__name__)
+
+# Store the default address of the service
+HOST = "127.0.0.1"
+PORT = 8765
+
+# Store the seconds between checks of the data files
+INTERVAL = 2.0
+
+# Store the largest number of courses returned by a query
+LIMIT = 1000
+
+# Store the reason phrase of each status code sent
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    503: "Service Unavailable",
+}
+
+
+class Snapshot:
+    """A built course overview and the sources of its course details
+
+    A snapshot is never changed once loaded, so requests can keep using the
+    one they started with while a newer one replaces it.
+
+    Args:
+        indexed (Planner): The indexed course overview
+        sources (dict): The requirements, price history and course
+            evaluations
+        version (int): The number of the snapshot
+    """
+
+    def __init__(self, indexed, sources, version):
+        self.indexed = indexed
+        self.sources = sources
+        self.version = version
+        self.built = datetime.datetime.now().isoformat(timespec="seconds")
+
+        # Index the rows of each course in every source
+        self.courses = {}
+        for name, df in sources.items():
+            groups = df.groupby(df["Course"].astype(int), sort=False).indices
+            self.courses[name] = groups
+
+    def detail(self, course):
+        """Collect the sections and sources of a course
+
+        Args:
+            course (int): The course number
+
+        Returns:
+            dict: The sections, requirements, price history and evaluations,
+                or None if the course is not offered
+        """
+
+        sections = self.indexed.positions("Course", float(course))
+        if len(sections) == 0:
+            return None
+        detail = {"course": course}
+        detail["sections"] = records(self.indexed.df.iloc[sections])
+        for name, df in self.sources.items():
+            rows = self.courses[name].get(course, [])
+            detail[name] = records(df.iloc[rows])
+
+        # List the areas satisfied rather than a flag for every area
+        if detail.get("requirements"):
+            flags = detail["requirements"][0]
+            detail["requirements"] = [
+                area for area, flag in flags.items() if flag == 1
+            ]
+        return detail
+
+
+def load(version, fname=os.path.join("output", "manifest.json")):
+    """Load the snapshot built by the last run of main.py
+
+    Args:
+        version (int): The number of the snapshot
+        fname (str, optional): The name of the manifest file. Defaults to
+            output/manifest.json.
+
+    Returns:
+        Snapshot: The snapshot, or None if nothing was built
+    """
+
+    manifest = build.Manifest(fname)
+    indexed = manifest.load("index", planner.Planner)
+    if indexed is None:
+        return None
+    sources = {
+        "requirements": manifest.load("requirements", requirements.main),
+        "prices": manifest.load("prices", price_history.main),
+        "evaluations": manifest.load("evals", course_evals.main),
+    }
+    sources = {name: df for name, df in sources.items() if df is not None}
+    return Snapshot(indexed, sources, version)
+
+
+def records(df):
+    """Convert a df into JSON records
+
+    Args:
+        df (DataFrame): The df
+
+    Returns:
+        list: A dict for each row, with None for missing values
+    """
+
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def signature(directory):
+    """Fingerprint the files of a directory by their size and modification
+
+    Args:
+        directory (str): The name of the directory
+
+    Returns:
+        tuple: The name, size and modification time of each file
+    """
+
+    found = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.is_file():
+            stat = entry.stat()
+            found.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(found)
+
+
+class Service:
+    """A local HTTP service answering queries from a warm course overview
+
+    The service watches the data directory and rebuilds the overview in a
+    worker process when a file changes, then swaps in the new snapshot.
+    Requests are answered from the current snapshot throughout.
+
+    Args:
+        func (function): The build, called as func(**kwargs)
+        kwargs (dict, optional): The arguments of the build. Defaults to
+            None.
+        directory (str, optional): The data directory to watch. Defaults to
+            "data".
+        interval (float, optional): The seconds between checks of the data
+            files. Defaults to INTERVAL.
+    """
+
+    def __init__(self, func, kwargs=None, directory="data", interval=INTERVAL):
+        self.func = func
+        self.kwargs = kwargs or {}
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = None
+        self.version = 0
+        self.rebuilding = False
+
+    async def rebuild(self):
+        """Build the overview in a worker process and swap in the snapshot
+
+        Returns:
+            bool: Whether the build succeeded
+        """
+
+        self.rebuilding = True
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            with parallel.pool(1) as executor:
+                await loop.run_in_executor(
+                    executor, build_quietly, self.func, self.kwargs
+                )
+            snapshot = await loop.run_in_executor(None, load, self.version + 1)
+        except Exception:
+            logger.exception("Rebuilding the course overview failed")
+            return False
+        finally:
+            self.rebuilding = False
+
+        # Swap in the snapshot, which requests pick up from now on
+        if snapshot is not None:
+            self.version = snapshot.version
+            self.snapshot = snapshot
+            logger.info(
+                f"Serving snapshot {snapshot.version}, built in "
+                f"{time.perf_counter() - start:.1f} s"
+            )
+        return snapshot is not None
+
+    async def watch(self):
+        """Rebuild whenever the data files change
+
+        A change is only acted on once the files stay the same for one
+        interval, so that a file being copied is not read half written.
+        """
+
+        built = None
+        previous = None
+        while True:
+            current = signature(self.directory)
+            if current != built and current == previous:
+                logger.info(f"Rebuilding after a change in {self.directory}")
+                await self.rebuild()
+                built = current
+            previous = current
+            await asyncio.sleep(self.interval)
+
+    async def serve(self, host=HOST, port=PORT):
+        """Serve requests until cancelled
+
+        The last built snapshot is served right away while the first
+        rebuild checks for changes.
+
+        Args:
+            host (str, optional): The host to bind. Defaults to HOST.
+            port (int, optional): The port to bind. Defaults to PORT.
+        """
+
+        loop = asyncio.get_running_loop()
+        self.snapshot = await loop.run_in_executor(None, load, 0)
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f"Serving the course planner on http://{host}:{port}")
+        async with server:
+            watcher = asyncio.ensure_future(self.watch())
+            try:
+                await server.serve_forever()
+            finally:
+                watcher.cancel()
+
+    async def handle(self, reader, writer):
+        """Answer the requests of a connection
+
+        Args:
+            reader (StreamReader): The stream of the request
+            writer (StreamWriter): The stream of the response
+        """
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status, body = self.respond(method, target)
+                keep = headers.get("connection", "").lower() != "close"
+                keep = keep and version == "HTTP/1.1"
+                payload = json.dumps(body).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(payload)}\r\n"
+                        f"Connection: {'keep-alive' if keep else 'close'}"
+                        "\r\n\r\n"
+                    ).encode()
+                    + payload
+                )
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, method, target):
+        """Route a request to its handler
+
+        Args:
+            method (str): The HTTP method
+            target (str): The path and query string
+
+        Returns:
+            tuple: The status code and the JSON body
+        """
+
+        if method != "GET":
+            return 405, {"error": f"Unsupported method {method}"}
+        url = urllib.parse.urlsplit(target)
+        params = urllib.parse.parse_qs(url.query)
+        path = url.path.rstrip("/") or "/"
+
+        # Take the snapshot once so a swap does not change it mid-request
+        snapshot = self.snapshot
+        if path == "/health":
+            return self.health(snapshot)
+        if snapshot is None:
+            return 503, {"error": "The course overview is still building"}
+        try:
+            if path == "/courses":
+                return self.query(snapshot, params)
+            head, _, course = path.rpartition("/")
+            if head == "/courses" and course.isdigit():
+                return self.course(snapshot, int(course))
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"error": str(error.args[0] if error.args else error)}
+        return 404, {"error": f"Unknown path {url.path}"}
+
+    def health(self, snapshot):
+        """Describe the snapshot being served
+
+        Args:
+            snapshot (Snapshot): The current snapshot
+
+        Returns:
+            tuple: The status code and the JSON body
+        """
+
+        body = {"rebuilding": self.rebuilding, "version": None}
+        if snapshot is not None:
+            body.update(
+                version=snapshot.version,
+                built=snapshot.built,
+                courses=len(snapshot.indexed.df),
+            )
+        return 200, body
+
+    def query(self, snapshot, params):
+        """Select the courses matching every where parameter
+
+        Args:
+            snapshot (Snapshot): The current snapshot
+            params (dict): The where, columns and limit parameters, as in
+                the query command
+
+        Returns:
+            tuple: The status code and the JSON body
+        """
+
+        filters = planner.parse(params.get("where", []))
+        limit = int(params.get("limit", [LIMIT])[0])
+        df = snapshot.indexed.df
+        positions = snapshot.indexed.match(filters)
+
+        # Show the filtered columns after the usual ones
+        shown = [c for c in planner.DISPLAY if c in df.columns]
+        for column in [*filters, *params.get("columns", [])]:
+            if column not in df.columns:
+                raise KeyError(f"Unknown column: {column}")
+            if column not in shown:
+                shown.append(column)
+
+        # Only copy the rows and columns returned
+        columns = df.columns.get_indexer(shown)
+        return 200, {
+            "version": snapshot.version,
+            "count": len(positions),
+            "courses": records(df.iloc[positions[:limit], columns]),
+        }
+
+    def course(self, snapshot, course):
+        """Describe every section and source of a course
+
+        Args:
+            snapshot (Snapshot): The current snapshot
+            course (int): The course number
+
+        Returns:
+            tuple: The status code and the JSON body
+        """
+
+        detail = snapshot.detail(course)
+        if detail is None:
+            return 404, {"error": f"Course {course} is not offered"}
+        return 200, {"version": snapshot.version, **detail}
+
+
+def build_quietly(func, kwargs):
+    """Run a build in a worker process, returning nothing to the parent
+
+    The snapshot is loaded from the cache instead, which avoids sending the
+    whole overview back between processes.
+
+    Args:
+        func (function): The build
+        kwargs (dict): The arguments of the build
+    """
+
+    func(**kwargs)
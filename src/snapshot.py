@@ -0,0 +1,187 @@
+import datetime
+import importlib.util
+import json
+import logging
+import os
+import shutil
+from . import instrument
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of a snapshot changes
+VERSION = 1
+
+# Store where the snapshots are written
+DIRECTORY = os.path.join("output", "snapshot")
+
+# Store the name of the file pointing at the current snapshot
+CURRENT = "CURRENT"
+
+# Store the number of snapshots kept, so readers of the last one still work
+KEEP = 2
+
+
+def available():
+    """Check whether pyarrow is installed to write snapshots
+
+    Returns:
+        bool: Whether snapshots can be written and read
+    """
+
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def slug(name):
+    """Name the file of a table
+
+    Args:
+        name (str): The name of the table, such as "Price History"
+
+    Returns:
+        str: The name of the file, such as "price_history.arrow"
+    """
+
+    return f"{name.lower().replace(' ', '_')}.arrow"
+
+
+@instrument.timed
+def write(sheets, directory=DIRECTORY):
+    """Write the sheets as a new versioned snapshot of Arrow IPC files
+
+    Each sheet is written as an uncompressed Arrow IPC (Feather v2) file so
+    that it can be memory-mapped. The snapshot is written to its own
+    directory and then made current by replacing the CURRENT file, so
+    readers never see a half written snapshot.
+
+    Args:
+        sheets (dict): The df of each sheet
+        directory (str, optional): The directory of the snapshots. Defaults
+            to DIRECTORY.
+
+    Returns:
+        str: The directory of the new snapshot
+    """
+
+    from pyarrow import feather
+
+    # Write the tables into a directory named after the time
+    created = datetime.datetime.now()
+    name = created.strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    tables = {}
+    for sheet, df in sheets.items():
+        fname = slug(sheet)
+        feather.write_feather(
+            df.reset_index(drop=True),
+            os.path.join(path, fname),
+            compression="uncompressed",
+        )
+        tables[sheet] = {
+            "file": fname,
+            "rows": len(df),
+            "columns": [str(c) for c in df.columns],
+        }
+    with open(os.path.join(path, "snapshot.json"), "w") as f:
+        json.dump(
+            {
+                "version": VERSION,
+                "created": created.isoformat(timespec="seconds"),
+                "tables": tables,
+            },
+            f,
+            indent=2,
+        )
+
+    # Point readers at the new snapshot
+    tmp = os.path.join(directory, f"{CURRENT}.tmp")
+    with open(tmp, "w") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(directory, CURRENT))
+    logger.info(f"Saved columnar snapshot to {path}")
+
+    # Remove the oldest snapshots
+    names = sorted(
+        entry.name
+        for entry in os.scandir(directory)
+        if entry.is_dir() and entry.name != name
+    )
+    for old in names[: max(len(names) - (KEEP - 1), 0)]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+    return path
+
+
+def current(directory=DIRECTORY):
+    """Find the current snapshot and describe its tables
+
+    Args:
+        directory (str, optional): The directory of the snapshots. Defaults
+            to DIRECTORY.
+
+    Returns:
+        tuple: The directory of the snapshot and its description
+    """
+
+    try:
+        with open(os.path.join(directory, CURRENT), "r") as f:
+            path = os.path.join(directory, f.read().strip())
+        with open(os.path.join(path, "snapshot.json"), "r") as f:
+            description = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No snapshot was found in {directory}, run python main.py with "
+            "pyarrow installed first"
+        ) from None
+    if description["version"] != VERSION:
+        raise ValueError(
+            f"The snapshot in {path} has version {description['version']} "
+            f"rather than {VERSION}, run python main.py again"
+        )
+    return path, description
+
+
+def read(name, columns=None, directory=DIRECTORY):
+    """Memory-map a table of the current snapshot
+
+    The columns are backed by the mapped file rather than copied, so only
+    the pages of the columns used are read from disk.
+
+    Args:
+        name (str): The name of the table, such as "Planner"
+        columns (list, optional): The columns to keep. Defaults to None,
+            which keeps every column.
+        directory (str, optional): The directory of the snapshots. Defaults
+            to DIRECTORY.
+
+    Returns:
+        Table: The pyarrow table
+    """
+
+    import pyarrow as pa
+
+    path, description = current(directory)
+    if name not in description["tables"]:
+        raise KeyError(f"Unknown table: {name}")
+    fname = os.path.join(path, description["tables"][name]["file"])
+    with pa.memory_map(fname, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def load(name, columns=None, directory=DIRECTORY):
+    """Load a table of the current snapshot as a df
+
+    Args:
+        name (str): The name of the table, such as "Planner"
+        columns (list, optional): The columns to load. Defaults to None,
+            which loads every column.
+        directory (str, optional): The directory of the snapshots. Defaults
+            to DIRECTORY.
+
+    Returns:
+        DataFrame: The table with the types it was written with
+    """
+
+    return read(name, columns, directory).to_pandas()
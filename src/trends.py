@@ -0,0 +1,135 @@
+import logging
+import numpy as np
+from . import helper, instrument, join
+
+logger = logging.getLogger(__name__)
+
+# Store the bidding phases whose clearing prices are tracked
+PHASES = ["P1", "P2"]
+
+# Store the number of most recent terms summarized for each group
+WINDOW = 4
+
+
+def terms(df, phases):
+    """Reduce the price history to one row per group and term
+
+    The sections of a group in the same term are combined by the median of
+    their prices and the sum of their seats.
+
+    Args:
+        df (DataFrame): The price history
+        phases (list): The bidding phases to keep
+
+    Returns:
+        DataFrame: The prices, seats taken and total seats of each group and
+            term
+    """
+
+    frame = df[join.GROUP_VARS].reset_index(drop=True)
+    frame["Term"] = helper.term(df["Year"], df["Quarter"])
+    prices = [f"Price for {phase}" for phase in phases]
+    for column in prices:
+        frame[column] = df[column].to_numpy(float, na_value=np.nan)
+
+    # Count the seats taken after the last phase with enrollment
+    taken = [c for c in df.columns if c.startswith("Taken after ")]
+    frame["Taken"] = df[taken[-1]].to_numpy(float, na_value=np.nan)
+    frame["Seats"] = df["Total Seats"].to_numpy(float, na_value=np.nan)
+
+    grouped = frame.groupby([*join.GROUP_VARS, "Term"], observed=True)
+    medians = grouped[prices].median()
+    medians[["Taken", "Seats"]] = grouped[["Taken", "Seats"]].sum()
+    return medians.reset_index()
+
+
+@instrument.timed
+def main(df, window=WINDOW, phases=PHASES):
+    """Summarize the recent price history of each course and instructor
+
+    The terms of each group are ranked from the latest back in one sort,
+    and the statistics are computed over the window of the most recent
+    terms as arrays with a row per group and a column per term.
+
+    Args:
+        df (DataFrame): The price history
+        window (int, optional): The number of recent terms summarized.
+            Defaults to WINDOW.
+        phases (list, optional): The bidding phases to summarize. Defaults
+            to PHASES.
+
+    Returns:
+        DataFrame: For each group, the price of each recent term, the
+            lowest and highest price, the trend in points per term and the
+            share of terms closing at 0 and the number of terms priced
+            within the window of each phase, and the share of seats filled
+            over the window
+    """
+
+    if window < 1:
+        raise ValueError(f"The window must be at least 1 term, not {window}")
+    phases = [p for p in phases if f"Price for {p}" in df.columns]
+    rows = terms(df, phases)
+
+    # Rank the terms of each group from the latest back
+    key = join.pack(rows)
+    term = rows["Term"].to_numpy()
+    order = np.lexsort((-term, key))
+    rows = rows.iloc[order].reset_index(drop=True)
+    key, term = key[order], term[order]
+    first = np.r_[True, key[1:] != key[:-1]]
+    starts = np.flatnonzero(first)
+    group = np.cumsum(first) - 1
+    rank = np.arange(len(rows)) - starts[group]
+
+    # Spread the recent terms into a row per group and a column per rank
+    recent = rank < window
+    g, r = group[recent], rank[recent]
+    shape = (len(starts), window)
+
+    def spread(values):
+        grid = np.full(shape, np.nan)
+        grid[g, r] = values[recent]
+        return grid
+
+    t = spread(term.astype(float))
+    summary = rows.loc[starts, join.GROUP_VARS].reset_index(drop=True)
+    for phase in phases:
+        y = spread(rows[f"Price for {phase}"].to_numpy())
+        for k in range(window):
+            summary[f"Price for {phase} Term -{k + 1}"] = y[:, k]
+
+        # Reduce the priced terms of each group
+        priced = ~np.isnan(y)
+        n = priced.sum(axis=1)
+        low = np.where(priced, y, np.inf).min(axis=1)
+        high = np.where(priced, y, -np.inf).max(axis=1)
+        summary[f"Min Price for {phase}"] = np.where(n > 0, low, np.nan)
+        summary[f"Max Price for {phase}"] = np.where(n > 0, high, np.nan)
+
+        # Fit a least-squares trend over the terms, centered for precision
+        tc = np.where(priced, t - np.nanmean(t, axis=1, keepdims=True), 0)
+        yc = np.where(priced, y, 0)
+        st, sy = tc.sum(axis=1), yc.sum(axis=1)
+        stt, sty = (tc * tc).sum(axis=1), (tc * yc).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = n * stt - st * st
+            slope = (n * sty - st * sy) / denominator
+            zero = (priced & (y == 0)).sum(axis=1) / n
+        summary[f"Price Slope for {phase}"] = np.where(
+            denominator > 0, slope, np.nan
+        )
+        summary[f"Zero Close Share for {phase}"] = np.where(
+            n > 0, zero, np.nan
+        )
+        summary[f"Terms Priced for {phase}"] = n
+
+    # Share the seats filled over the window
+    taken = np.nansum(spread(rows["Taken"].to_numpy()), axis=1)
+    seats = np.nansum(spread(rows["Seats"].to_numpy()), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["Fill Rate"] = np.where(seats > 0, taken / seats, np.nan)
+    logger.info(
+        f"Summarized {len(rows)} terms of prices for {len(starts)} groups"
+    )
+    return summary
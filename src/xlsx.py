@@ -0,0 +1,298 @@
+import datetime
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+import numpy as np
+from . import instrument
+
+
+def local(tag):
+    """Remove the namespace from an XML tag or attribute
+
+    Args:
+        tag (str): The qualified name
+
+    Returns:
+        str: The local name
+    """
+
+    return tag.rsplit("}", 1)[-1]
+
+
+def attribute(element, name):
+    """Get an attribute of an XML element ignoring its namespace
+
+    Args:
+        element (Element): The XML element
+        name (str): The local name of the attribute
+
+    Returns:
+        str: The value of the attribute, or None if it is missing
+    """
+
+    for k, v in element.attrib.items():
+        if local(k) == name:
+            return v
+    return None
+
+
+def relationships(archive, path):
+    """Read the relationships of a part of the workbook
+
+    Args:
+        archive (ZipFile): The opened workbook
+        path (str): The name of the part
+
+    Returns:
+        dict: A mapping of relationship id to its element attributes
+    """
+
+    folder, name = posixpath.split(path)
+    rels = posixpath.join(folder, "_rels", f"{name}.rels")
+    if rels not in archive.namelist():
+        return {}
+    root = ElementTree.fromstring(archive.read(rels))
+    return {e.get("Id"): e.attrib for e in root}
+
+
+def sheet_path(archive, sheet):
+    """Find the part holding a worksheet
+
+    Args:
+        archive (ZipFile): The opened workbook
+        sheet (str or int): The name or position of the sheet
+
+    Returns:
+        tuple: The name of the part and whether dates use the 1904 epoch
+    """
+
+    root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    date1904 = False
+    sheets = []
+    for element in root.iter():
+        if local(element.tag) == "workbookPr":
+            date1904 = element.get("date1904") in ("1", "true")
+        elif local(element.tag) == "sheet":
+            sheets.append((element.get("name"), attribute(element, "id")))
+
+    # Select the sheet by position or by name
+    if isinstance(sheet, int):
+        rid = sheets[sheet][1]
+    else:
+        rid = dict(sheets)[sheet]
+
+    target = relationships(archive, "xl/workbook.xml")[rid]["Target"]
+    if target.startswith("/"):
+        path = target.lstrip("/")
+    else:
+        path = posixpath.normpath(posixpath.join("xl", target))
+    return path, date1904
+
+
+def shared_strings(archive):
+    """Read the shared strings of the workbook
+
+    Args:
+        archive (ZipFile): The opened workbook
+
+    Returns:
+        list: The shared strings
+    """
+
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ElementTree.iterparse(f):
+            if local(element.tag) == "si":
+                strings.append(text(element))
+                element.clear()
+    return strings
+
+
+def text(element):
+    """Join the text runs of a string item, skipping phonetic runs
+
+    Args:
+        element (Element): The string item
+
+    Returns:
+        str: The text
+    """
+
+    parts = []
+    for child in element:
+        if local(child.tag) == "t":
+            parts.append(child.text or "")
+        elif local(child.tag) == "r":
+            parts.extend(t.text or "" for t in child if local(t.tag) == "t")
+    return "".join(parts)
+
+
+def date_styles(archive):
+    """Find the cell styles that format numbers as dates
+
+    Args:
+        archive (ZipFile): The opened workbook
+
+    Returns:
+        set: The indices of the date styles
+    """
+
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+
+    root = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    formats = dict(BUILTIN_FORMATS)
+    styles = set()
+    for element in root:
+        if local(element.tag) == "numFmts":
+            for fmt in element:
+                formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+        elif local(element.tag) == "cellXfs":
+            for i, xf in enumerate(element):
+                code = formats.get(int(xf.get("numFmtId", 0)), "General")
+                if is_date_format(code):
+                    styles.add(i)
+    return styles
+
+
+def convert(cell, strings, dates, epoch):
+    """Convert a cell to the value pandas reads from it
+
+    Args:
+        cell (Element): The cell element
+        strings (list): The shared strings
+        dates (set): The indices of the date styles
+        epoch (datetime): The date epoch of the workbook
+
+    Returns:
+        object: The value of the cell
+    """
+
+    kind = cell.get("t", "n")
+    value = None
+    for child in cell:
+        if local(child.tag) == "v":
+            value = child.text
+        elif local(child.tag) == "is":
+            value = text(child)
+
+    if value is None:
+        return ""
+    elif kind == "s":
+        return strings[int(value)]
+    elif kind == "b":
+        return value == "1"
+    elif kind == "e":
+        return np.nan
+    elif kind == "d":
+        return datetime.datetime.fromisoformat(value)
+    elif kind == "n":
+        number = float(value)
+        if int(cell.get("s", 0)) in dates:
+            from openpyxl.utils.datetime import from_excel
+
+            return from_excel(number, epoch)
+        elif number.is_integer():
+            return int(number)
+        return number
+    return value
+
+
+@instrument.timed
+def read(fname, sheet=0, link_column=None):
+    """Read a worksheet in a single streaming pass
+
+    The cell values are converted like pd.read_excel, and the hyperlinks
+    in link_column are collected from the same pass over the sheet XML.
+
+    Args:
+        fname (str): The name of the file
+        sheet (str or int, optional): The name or position of the sheet.
+            Defaults to 0.
+        link_column (str, optional): The column letter of the hyperlinks
+            to return in a "Syllabus" column. Defaults to None.
+
+    Returns:
+        DataFrame: The sheet with the first row as header
+    """
+
+    # Import openpyxl on first use, as it is slow to import
+    from openpyxl.utils.cell import (
+        column_index_from_string,
+        coordinate_from_string,
+        range_boundaries,
+    )
+    from openpyxl.utils.datetime import (
+        CALENDAR_MAC_1904,
+        CALENDAR_WINDOWS_1900,
+    )
+    from pandas.io.parsers import TextParser
+
+    with zipfile.ZipFile(fname) as archive:
+        path, date1904 = sheet_path(archive, sheet)
+        strings = shared_strings(archive)
+        dates = date_styles(archive)
+        epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+        targets = relationships(archive, path)
+
+        # Stream over the rows, dropping each one once it is converted
+        data = []
+        links = {}
+        last_row_with_data = -1
+        parent = None
+        with archive.open(path) as f:
+            for event, element in ElementTree.iterparse(f, ("start", "end")):
+                tag = local(element.tag)
+                if event == "start":
+                    if tag == "sheetData":
+                        parent = element
+                    continue
+
+                if tag == "row":
+                    r = int(element.get("r", len(data) + 1)) - 1
+                    while len(data) < r:
+                        data.append([])
+                    row = []
+                    for cell in element:
+                        ref = cell.get("r")
+                        if ref is not None:
+                            c = column_index_from_string(
+                                coordinate_from_string(ref)[0]
+                            )
+                            row.extend([""] * (c - 1 - len(row)))
+                        row.append(convert(cell, strings, dates, epoch))
+                    while row and row[-1] == "":
+                        row.pop()
+                    if row:
+                        last_row_with_data = r
+                    data.append(row)
+                    parent.clear()
+                elif tag == "hyperlink" and link_column is not None:
+                    rid = attribute(element, "id")
+                    target = targets.get(rid, {}).get("Target", "")
+                    min_col, min_row, max_col, max_row = range_boundaries(
+                        element.get("ref")
+                    )
+                    column = column_index_from_string(link_column)
+                    if min_col <= column <= max_col:
+                        for r in range(min_row, max_row + 1):
+                            links[r] = target
+
+    # Trim trailing empty rows and extend rows to the maximum width
+    data = data[: last_row_with_data + 1]
+    if data:
+        width = max(len(row) for row in data)
+        data = [row + [""] * (width - len(row)) for row in data]
+
+    # Parse the header and types like pd.read_excel
+    df = TextParser(data, header=0, skip_blank_lines=False).read()
+
+    # Add the hyperlinks of the data rows below the header
+    if link_column is not None:
+        df["Syllabus"] = [links.get(r, "") for r in range(2, len(df) + 2)]
+    return df